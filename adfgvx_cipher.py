@@ -1,12 +1,36 @@
 import unicodedata
 import random
-from typing import List, Tuple, Optional
+import re
+import itertools
+import contextvars
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Tuple,
+    Optional,
+)
 
 ALPHABET_CZECH_25 = "ABCDEFGHIJKLMNOPQRSTUVXYZ"  # bez W
 ALPHABET_ENGLISH_25 = "ABCDEFGHIKLMNOPQRSTUVWXYZ"  # bez J
 ALPHABET_36 = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+# Medzera a interpunkcia priamo v matici, bez SPACE_MARKER
+ALPHABET_49 = ALPHABET_36 + " .,?!-:;'\"()/"
+# 7x7 + ceske pismena s diakritikou
+ALPHABET_CZECH_64 = ALPHABET_49 + "ÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ"
 ADFGX_INDICES = ["A", "D", "F", "G", "X"]
 ADFGVX_INDICES = ["A", "D", "F", "G", "V", "X"]
+ADFGVXZ_INDICES = ["A", "D", "F", "G", "V", "X", "Z"]
+ADFGKVXZ_INDICES = ["A", "D", "F", "G", "K", "V", "X", "Z"]
 SPACE_MARKER = "XMEZERAX"
 
 
@@ -23,26 +47,61 @@ def normalize_by_language(text: str, alphabet: str) -> str:
     return text
 
 
-def filter_input(text: str, alphabet: str) -> Tuple[str, str]:
-    text = remove_diacritics(text).upper()
-    text = normalize_by_language(text, alphabet)
+def _is_allowed(char: str, alphabet: str, keep: str = "") -> bool:
+    return char == " " or char.isdigit() or char in alphabet or char in keep
+
+
+# Cela normalizacia (diakritika, upper, W/J, zakazane znaky) pre jeden znak.
+# Znak, ktory je v abecede (napr. Č v 8x8 matici), diakritiku nestrati
+def _fold_char(char: str, alphabet: str, keep: str = "") -> Optional[str]:
+    upper = char.upper()
+    if upper in alphabet and len(upper) == 1:
+        return upper
+    text = normalize_by_language(remove_diacritics(char).upper(), alphabet)
+    return "".join(c for c in text if _is_allowed(c, alphabet, keep)) or None
+
+
+# Tabulka pre str.translate, ne-ASCII znaky sa doplnaju az ked sa objavia
+class _FilterTable(dict):
+    def __init__(self, alphabet: str, keep: str = ""):
+        super().__init__()
+        self.alphabet = alphabet
+        self.keep = keep
+
+    def __missing__(self, code):
+        folded = _fold_char(chr(code), self.alphabet, self.keep)
+        self[code] = folded
+        return folded
+
+
+@lru_cache(maxsize=32)
+def _filter_tables(alphabet: str, keep: str = "") -> Tuple[_FilterTable, bytes, bytes]:
+    table = _FilterTable(alphabet, keep)
+
+    # ASCII cast ako tabulka pre bytes.translate
+    ascii_map = bytearray(range(256))
+    ascii_delete = bytearray()
+    for code in range(128):
+        folded = table[code]
+        if folded is None:
+            ascii_delete.append(code)
+        else:
+            ascii_map[code] = ord(folded)
+
+    return table, bytes(ascii_map), bytes(ascii_delete)
+
+
+# keep = dalsie povolene znaky (napr. interpunkcia, ktora ma svoj token)
+def filter_text(text: str, alphabet: str, keep: str = "") -> str:
+    table, ascii_map, ascii_delete = _filter_tables(alphabet, keep)
+    if text.isascii():
+        return text.encode("ascii").translate(ascii_map, ascii_delete).decode("ascii")
+    return text.translate(table)
 
-    result = []
-    display = []
-
-    for char in text:
-        if char == " ":
-            result.append(" ")
-            display.append(" ")
-        elif char.isdigit():
-            result.append(char)
-            display.append(char)
-        elif char in alphabet:
-            result.append(char)
-            display.append(char)
-
-    filtered_text = "".join(result)
-    display_text = " ".join(display)
+
+def filter_input(text: str, alphabet: str) -> Tuple[str, str]:
+    filtered_text = filter_text(text, alphabet)
+    display_text = " ".join(filtered_text)
 
     return filtered_text, display_text
 
@@ -103,48 +162,106 @@ def substitute_encrypt(
     return "".join(result)
 
 
-def transpose_encrypt(substituted: str, keyword: str) -> Tuple[str, List[str]]:
-    clean_text = "".join(c for c in substituted if c.isalpha())
-
-    key_len = len(keyword)
+PLAN_CACHE_SIZE = 256
 
-    # Vytvori stlpce
-    columns = [""] * key_len
-    for i, char in enumerate(clean_text):
-        columns[i % key_len] += char
 
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def transposition_order(keyword: str) -> Tuple[int, ...]:
     # Zoradi indexy podla keyword abecedne
-    sorted_indices = sorted(range(key_len), key=lambda k: keyword[k])
-    result = []
-    column_display = []
+    return tuple(sorted(range(len(keyword)), key=lambda k: keyword[k]))
+
+
+class TranspositionPlan:
+    # Permutacia stlpcovej transpozicie pre dany keyword a dlzku textu;
+    # order moze prist uz predpocitany (napr. z keystore)
+    def __init__(
+        self, keyword: str, length: int, order: Optional[Tuple[int, ...]] = None
+    ):
+        if not keyword:
+            raise ValueError("Keyword must not be empty")
+
+        self.keyword = keyword
+        self.length = length
+        self.order = transposition_order(keyword) if order is None else order
+
+        key_len = len(keyword)
+        base_len = length // key_len
+        extra = length % key_len
+
+        # (povodny stlpec, zaciatok, koniec) v zasifrovanom texte
+        spans = []
+        pos = 0
+        for idx in self.order:
+            col_len = base_len + (1 if idx < extra else 0)
+            spans.append((idx, pos, pos + col_len))
+            pos += col_len
+        self.spans = tuple(spans)
+
+        # Miesto pre data inych enginov (napr. NumPy pole permutacie); plany
+        # su v zdielanej cache, takze sem patria len male data
+        self.engine_data = {}
+
+    def columns(self, text: str) -> List[str]:
+        key_len = len(self.keyword)
+        return [text[idx::key_len] for idx in self.order]
+
+    def apply(self, text: str) -> str:
+        return "".join(self.columns(text))
+
+    def invert(self, ciphertext: str) -> str:
+        key_len = len(self.keyword)
+        result = [""] * self.length
+        for idx, start, stop in self.spans:
+            result[idx::key_len] = ciphertext[start:stop]
+        return "".join(result)
+
+    # To iste nad bajtmi, out uz musi mat dlzku self.length
+    def apply_into(self, data: bytes, out: bytearray) -> bytearray:
+        key_len = len(self.keyword)
+        for idx, start, stop in self.spans:
+            out[start:stop] = data[idx::key_len]
+        return out
+
+    def invert_into(self, ciphertext: bytes, out: bytearray) -> bytearray:
+        key_len = len(self.keyword)
+        for idx, start, stop in self.spans:
+            out[idx::key_len] = ciphertext[start:stop]
+        return out
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def get_transposition_plan(
+    keyword: str, length: int, order: Optional[Tuple[int, ...]] = None
+) -> TranspositionPlan:
+    return TranspositionPlan(keyword, length, order)
 
-    for idx in sorted_indices:
-        result.append(columns[idx])
-        column_display.append(f"{keyword[idx]}: {columns[idx]}")
 
-    return "".join(result), column_display
+def transpose_encrypt(substituted: str, keyword: str) -> Tuple[str, List[str]]:
+    clean_text = "".join(filter(str.isalpha, substituted))
 
+    plan = get_transposition_plan(keyword, len(clean_text))
+    columns = plan.columns(clean_text)
 
-def transpose_decrypt(ciphertext: str, keyword: str, substituted_len: int) -> str:
-    key_len = len(keyword)
+    column_display = [
+        f"{keyword[idx]}: {column}" for idx, column in zip(plan.order, columns)
+    ]
 
-    base_len = substituted_len // key_len
-    extra = substituted_len % key_len
+    return "".join(columns), column_display
 
-    # Zoradene indexy podla keyword
-    sorted_indices = sorted(range(key_len), key=lambda k: keyword[k])
 
-    # Rozdelíme ciphertext do stlpcov
-    columns = [""] * key_len
-    pos = 0
+def transpose_decrypt(ciphertext: str, keyword: str, substituted_len: int) -> str:
+    plan = get_transposition_plan(keyword, substituted_len)
+
+    if len(ciphertext) == substituted_len:
+        return plan.invert(ciphertext)
 
-    for sorted_pos, original_idx in enumerate(sorted_indices):
-        col_len = base_len + (1 if original_idx < extra else 0)
-        columns[original_idx] = ciphertext[pos : pos + col_len]
-        pos += col_len
+    # Dlzka nesedi, stlpce sa skladaju po riadkoch ako predtym
+    columns = [""] * len(keyword)
+    for idx, start, stop in plan.spans:
+        columns[idx] = ciphertext[start:stop]
 
     result = []
-    max_len = max(len(col) for col in columns) if columns else 0
+    max_len = max(len(col) for col in columns)
 
     for i in range(max_len):
         for col in columns:
@@ -182,75 +299,907 @@ def substitute_decrypt(
     return plaintext
 
 
-def encrypt(
-    plaintext: str, matrix_str: str, keyword: str, cipher_type: str
-) -> Tuple[str, str, str, List[List[str]], List[str]]:
+# Meranie faz (filter, substitucia, transpozicia). Collector sa preda cez
+# parameter alebo sa aktivuje blokom "with PhaseStats() as stats:"
+_active_collector = contextvars.ContextVar("adfgvx_phase_collector", default=None)
+
+
+class PhaseStats:
+    def __init__(self, callback: Optional[Callable[[Dict], None]] = None):
+        self.callback = callback
+        self.records = []
+        self._token = None
+
+    def record(
+        self,
+        operation: str,
+        phase: str,
+        seconds: float,
+        input_len: int,
+        output_len: int,
+        allocated_blocks: int,
+    ) -> None:
+        record = {
+            "operation": operation,
+            "phase": phase,
+            "seconds": seconds,
+            "input_len": input_len,
+            "output_len": output_len,
+            "allocated_blocks": allocated_blocks,
+        }
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for record in self.records:
+            key = f"{record['operation']}.{record['phase']}"
+            totals = summary.setdefault(
+                key,
+                {
+                    "calls": 0,
+                    "seconds": 0.0,
+                    "input_len": 0,
+                    "output_len": 0,
+                    "allocated_blocks": 0,
+                },
+            )
+            totals["calls"] += 1
+            for field in ("seconds", "input_len", "output_len", "allocated_blocks"):
+                totals[field] += record[field]
+        return summary
+
+    def dump(self, fp) -> None:
+        json.dump(self.summary(), fp, indent=2)
+
+    def reset(self) -> None:
+        self.records.clear()
+
+    def __enter__(self):
+        self._token = _active_collector.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_collector.reset(self._token)
+        self._token = None
+
+
+def _run_phase(phase: str, func, data):
+    return func(data)
+
+
+def phase_runner(collector, operation: str):
+    if collector is None:
+        collector = _active_collector.get()
+    # Bez collectora sa faza len zavola
+    if collector is None:
+        return _run_phase
+
+    def run(phase: str, func, data):
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        result = func(data)
+        seconds = time.perf_counter() - start
+        collector.record(
+            operation,
+            phase,
+            seconds,
+            len(data),
+            len(result),
+            sys.getallocatedblocks() - blocks,
+        )
+        return result
 
-    if cipher_type == "ADFGX_CZECH":
-        alphabet = ALPHABET_CZECH_25
-        indices = ADFGX_INDICES
-        size = 5
-    elif cipher_type == "ADFGX_ENGLISH":
-        alphabet = ALPHABET_ENGLISH_25
-        indices = ADFGX_INDICES
-        size = 5
-    elif cipher_type == "ADFGVX":
-        alphabet = ALPHABET_36
-        indices = ADFGVX_INDICES
-        size = 6
-    else:
-        raise ValueError(f"Unknown cipher type: {cipher_type}")
+    return run
 
-    filtered_text, display_text = filter_input(plaintext, alphabet)
 
-    if matrix_str and len(matrix_str) == size * size:
-        matrix = create_matrix(matrix_str, size)
-    else:
-        raise ValueError(f"Matrix must have exactly {size*size} characters")
+class CipherVariant(NamedTuple):
+    name: str
+    alphabet: str
+    indices: List[str]
+    size: int
+    # Tokeny, ked ich volajuci nezada (None = DEFAULT_TOKENS)
+    tokens: Optional[Dict[str, str]]
 
-    # Faza 1 Substitucia
-    substituted = substitute_encrypt(filtered_text, matrix, indices)
 
-    # Faza 2 Transpozicia
-    ciphertext, column_display = transpose_encrypt(substituted, keyword.upper())
+# Registrovane typy sifry podla mena; nova matica = nova registracia
+CIPHER_VARIANTS: Dict[str, CipherVariant] = {}
 
-    return ciphertext, display_text, substituted, matrix, column_display
 
+def register_variant(
+    name: str,
+    alphabet: str,
+    indices: List[str],
+    tokens: Optional[Dict[str, str]] = None,
+) -> CipherVariant:
+    size = len(indices)
+    if len(set(indices)) != size or not "".join(indices).isascii():
+        raise ValueError("Indices must be distinct ASCII characters")
+    if len(alphabet) != size * size or len(set(alphabet)) != len(alphabet):
+        raise ValueError(
+            f"Alphabet must have {size*size} distinct characters, got {len(alphabet)}"
+        )
 
-def decrypt(
-    ciphertext: str, matrix_str: str, keyword: str, cipher_type: str
-) -> Tuple[str, str, List[List[str]]]:
+    variant = CipherVariant(name, alphabet, list(indices), size, tokens)
+    CIPHER_VARIANTS[name] = variant
+    return variant
+
+
+def get_variant(cipher_type: str) -> CipherVariant:
+    try:
+        return CIPHER_VARIANTS[cipher_type]
+    except KeyError:
+        raise ValueError(f"Unknown cipher type: {cipher_type}") from None
+
+
+def resolve_cipher_type(cipher_type: str) -> Tuple[str, List[str], int]:
+    variant = get_variant(cipher_type)
+    return variant.alphabet, variant.indices, variant.size
+
+
+# Tabulka pre str.translate, neznamy znak sa zmaze (a zapamata si to)
+class _DeleteMissing(dict):
+    def __missing__(self, key):
+        self[key] = None
+        return None
+
+
+# Znaky, ktore sa sifruju ako cele slovo (marker). Medzera je vzdy XMEZERAX,
+# cislice a interpunkcia sa daju zapnut hlavne pre 5x5 matice bez cislic
+DEFAULT_TOKENS = {" ": SPACE_MARKER}
+DIGIT_TOKENS = {
+    "0": "XNULAX",
+    "1": "XJEDNAX",
+    "2": "XDVAX",
+    "3": "XTRIX",
+    "4": "XCTYRIX",
+    "5": "XPETX",
+    "6": "XSESTX",
+    "7": "XSEDMX",
+    "8": "XOSMX",
+    "9": "XDEVETX",
+}
+PUNCTUATION_TOKENS = {
+    ".": "XTECKAX",
+    ",": "XCARKAX",
+    "?": "XOTAZNIKX",
+    "!": "XVYKRICNIKX",
+}
+
+
+register_variant("ADFGX_CZECH", ALPHABET_CZECH_25, ADFGX_INDICES)
+register_variant("ADFGX_ENGLISH", ALPHABET_ENGLISH_25, ADFGX_INDICES)
+register_variant("ADFGVX", ALPHABET_36, ADFGVX_INDICES)
+# Medzera je v matici, takze jeden digraf namiesto 16 znakov markera
+register_variant("ADFGVXZ", ALPHABET_49, ADFGVXZ_INDICES, tokens={})
+register_variant("ADFGKVXZ_CZECH", ALPHABET_CZECH_64, ADFGKVXZ_INDICES, tokens={})
+
+
+class TokenTable:
+    # Tokeny skompilovane pre jednu maticu: znak -> hotova postupnost digrafov
+    # pri sifrovani, marker -> znak pri desifrovani
+    def __init__(
+        self, tokens: Dict[str, str], alphabet: str, encode_table: Dict[str, str]
+    ):
+        self.markers = {}
+        self.digraphs = {}
+        self.restore_map = {}
+        for char, marker in tokens.items():
+            if len(char) != 1:
+                raise ValueError(f"Token must be a single character: {char!r}")
+            marker = normalize_by_language(remove_diacritics(marker).upper(), alphabet)
+            if not marker:
+                raise ValueError(f"Token {char!r} has an empty marker")
+
+            # Znaky mimo matice sa vynechaju ako v substitute_encrypt, taky
+            # marker sa potom pri desifrovani nehlada
+            encodable = "".join(c for c in marker if c in encode_table)
+            self.markers[char] = encodable
+            self.digraphs[char] = "".join(encode_table[c] for c in encodable)
+            if encodable == marker:
+                self.restore_map.setdefault(marker, char)
+
+        # Token -> text markera; str.replace je ovela rychlejsi ako translate,
+        # ale ide len ked ziadny marker neobsahuje znak ineho tokenu
+        self._expand = {ord(char): marker for char, marker in self.markers.items()}
+        self._replacements = None
+        if not set(self.markers) & set("".join(self.markers.values())):
+            self._replacements = list(self.markers.items())
+
+        # Koniec textu, ktory este moze byt zaciatkom markera (pre streaming)
+        self.hold = max(map(len, self.restore_map), default=1) - 1
+
+        self._marker = self._char = self._pattern = None
+        if len(self.restore_map) == 1:
+            ((self._marker, self._char),) = self.restore_map.items()
+        elif self.restore_map:
+            # Dlhsie markery skor, aby kratsi nevyhral na rovnakej pozicii
+            markers = sorted(self.restore_map, key=len, reverse=True)
+            self._pattern = re.compile("(" + "|".join(map(re.escape, markers)) + ")")
+
+    # Znaky, ktore filter inak zahodi, ale maju vlastny token
+    def keep(self, alphabet: str) -> str:
+        return "".join(sorted(c for c in self.markers if not _is_allowed(c, alphabet)))
+
+    # Tokeny vo filtrovanom texte -> markery, zvysok sa uz sifruje po znakoch
+    def expand(self, text: str) -> str:
+        if self._replacements is None:
+            return text.translate(self._expand)
+        for char, marker in self._replacements:
+            text = text.replace(char, marker)
+        return text
+
+    # Markery v desifrovanom texte -> povodne znaky, jednym prechodom
+    def restore(self, text: str) -> str:
+        if self._marker is not None:
+            return text.replace(self._marker, self._char)
+        if self._pattern is not None:
+            return self._pattern.sub(self._restore_match, text)
+        return text
+
+    def _restore_match(self, match) -> str:
+        return self.restore_map[match.group()]
+
+    # [text, znak, text, znak, ..., text]
+    def _pieces(self, text: str) -> List[str]:
+        if self._marker is not None:
+            parts = text.split(self._marker)
+            pieces = [self._char] * (2 * len(parts) - 1)
+            pieces[0::2] = parts
+            return pieces
+        if self._pattern is not None:
+            pieces = self._pattern.split(text)
+            pieces[1::2] = map(self.restore_map.__getitem__, pieces[1::2])
+            return pieces
+        return [text]
+
+    # Vrati (hotovy text, koniec ktory moze byt zaciatkom dalsieho markera)
+    def split(self, text: str, final: bool) -> Tuple[str, str]:
+        if final:
+            return self.restore(text), ""
+
+        pieces = self._pieces(text)
+        rest = pieces[-1]
+        cut = max(0, len(rest) - self.hold)
+        pieces[-1] = rest[:cut]
+        return "".join(pieces), rest[cut:]
+
+
+# Tabulky zavisle len od indexov (digrafy po poziciach v matici a cistenie
+# sifrovaneho textu), spolocne pre vsetky kluce jedneho typu sifry
+@lru_cache(maxsize=None)
+def _index_tables(indices: Tuple[str, ...]):
+    digraphs = tuple(row + col for row in indices for col in indices)
+    codes = tuple(
+        int.from_bytes(digraph.encode("ascii"), sys.byteorder) for digraph in digraphs
+    )
+    clean_table = _DeleteMissing((ord(c), c) for c in indices)
+    clean_bytes = bytes(range(256)).upper()
+    clean_delete = bytes(
+        code for code in range(256) if chr(code).upper() not in indices
+    )
+    return digraphs, codes, clean_table, clean_bytes, clean_delete
+
+
+class CompiledCipher:
+    # Kluc pripraveny raz, encrypt/decrypt uz len pouzivaju tabulky
+    def __init__(
+        self,
+        cipher_type: str,
+        matrix_str: str,
+        keyword: str,
+        tokens: Optional[Dict[str, str]] = None,
+        order: Optional[Tuple[int, ...]] = None,
+    ):
+        variant = get_variant(cipher_type)
+        alphabet, indices, size = variant.alphabet, variant.indices, variant.size
+
+        if not matrix_str or len(matrix_str) != size * size:
+            raise ValueError(f"Matrix must have exactly {size*size} characters")
+
+        keyword = keyword.upper()
+        if not keyword:
+            raise ValueError("Keyword must not be empty")
+
+        self.cipher_type = cipher_type
+        self.alphabet = alphabet
+        self.indices = indices
+        self.size = size
+        self.matrix_str = matrix_str
+        self._matrix = None
+        self.keyword = keyword
+
+        if order is None:
+            order = transposition_order(keyword)
+        elif len(order) != len(keyword) or set(order) != set(range(len(keyword))):
+            raise ValueError("Column order does not match keyword")
+        self.order = tuple(order)
+
+        (
+            digraphs,
+            codes,
+            self._clean_table,
+            self._clean_bytes,
+            self._clean_delete,
+        ) = _index_tables(tuple(indices))
+
+        # digraf -> znak a digraf ako 16-bitove cislo (dva ASCII bajty) -> znak
+        self.decode_table = dict(zip(digraphs, matrix_str))
+        self._pair_table = dict(zip(codes, matrix_str))
+        # znak -> digraf; odzadu, aby vyhral prvy vyskyt ako vo find_position
+        self.encode_table = dict(zip(reversed(matrix_str), reversed(digraphs)))
+
+        if tokens is None:
+            tokens = DEFAULT_TOKENS if variant.tokens is None else variant.tokens
+        self.tokens = TokenTable(tokens, alphabet, self.encode_table)
+        self._filter_keep = self.tokens.keep(alphabet)
+
+        self._substitute_table = _DeleteMissing(
+            (ord(char), digraph) for char, digraph in self.encode_table.items()
+        )
+        # Token ma prednost pred znakom matice (napr. cislica v ADFGVX)
+        for char, digraphs in self.tokens.digraphs.items():
+            self._substitute_table[ord(char)] = digraphs
+        self._expanded_table = None
+        self._numpy_stages = None
+
+    # Matica na zobrazenie sa sklada az ked ju niekto potrebuje
+    @property
+    def matrix(self) -> List[List[str]]:
+        if self._matrix is None:
+            self._matrix = create_matrix(self.matrix_str, self.size)
+        return self._matrix
+
+    def substitute(self, filtered_text: str) -> str:
+        return filtered_text.translate(self._substitute_table)
+
+    # Text s uz rozvinutymi markermi (TokenTable.expand) -> digrafy; tokeny
+    # tu uz nemaju prednost, znak markera sa sifruje ako znak matice
+    def substitute_expanded(self, expanded: str) -> str:
+        if self._expanded_table is None:
+            self._expanded_table = _DeleteMissing(
+                (ord(char), digraph) for char, digraph in self.encode_table.items()
+            )
+        return expanded.translate(self._expanded_table)
+
+    def plan(self, length: int) -> TranspositionPlan:
+        return get_transposition_plan(self.keyword, length, self.order)
+
+    def transpose(self, substituted: str) -> str:
+        return self.plan(len(substituted)).apply(substituted)
+
+    def column_display(self, substituted: str) -> List[str]:
+        plan = self.plan(len(substituted))
+        return [
+            f"{self.keyword[idx]}: {column}"
+            for idx, column in zip(plan.order, plan.columns(substituted))
+        ]
+
+    def clean(self, ciphertext: str) -> str:
+        return ciphertext.upper().translate(self._clean_table)
+
+    # Ocakava uz vycisteny text (len ADFGX/ADFGVX znaky)
+    def untranspose(self, ciphertext: str) -> str:
+        return self.plan(len(ciphertext)).invert(ciphertext)
+
+    # Digrafy -> znaky, markery tokenov este ostavaju v texte
+    def decode_pairs(self, substituted: str) -> str:
+        return self.decode_buffer(substituted.encode("ascii"))
+
+    # Dvojice bajtov sa citaju ako 16-bitove cisla, bez skladania retazcov
+    def decode_buffer(self, data) -> str:
+        with memoryview(data) as view:
+            pairs = view[: len(view) - len(view) % 2].cast("H")
+            try:
+                return "".join(map(self._pair_table.__getitem__, pairs))
+            finally:
+                pairs.release()
+
+    def unsubstitute(self, substituted: str) -> str:
+        return self.tokens.restore(self.decode_pairs(substituted))
+
+    # Vrati objekt so substitute/transpose/untranspose/unsubstitute
+    def stages(self, engine: str = "python"):
+        if engine == "python":
+            return self
+        if engine != "numpy":
+            raise ValueError(f"Unknown engine: {engine}")
+
+        if self._numpy_stages is None:
+            import numpy_engine
+
+            # Bez NumPy (alebo s ne-ASCII maticou) ostane cisty Python
+            if not numpy_engine.supports(self):
+                return self
+            self._numpy_stages = numpy_engine.NumpyStages(self)
+        return self._numpy_stages
+
+    def encrypt_text(
+        self, plaintext: str, engine: str = "python", collector=None
+    ) -> str:
+        stages = self.stages(engine)
+        run = phase_runner(collector, "encrypt")
+        filtered_text = run("filter", self.filter_text, plaintext)
+        substituted = run("substitution", stages.substitute, filtered_text)
+        return run("transposition", stages.transpose, substituted)
+
+    def decrypt_text(
+        self, ciphertext: str, engine: str = "python", collector=None
+    ) -> str:
+        stages = self.stages(engine)
+        run = phase_runner(collector, "decrypt")
+        clean_cipher = run("filter", self.clean, ciphertext)
+        substituted = run("transposition", stages.untranspose, clean_cipher)
+        return run("substitution", stages.unsubstitute, substituted)
+
+    def filter_text(self, plaintext: str) -> str:
+        return filter_text(plaintext, self.alphabet, self._filter_keep)
+
+    # ASCII bytes sa filtruju priamo, ostatne sa dekoduju z bufferu bez kopie
+    def filter_bytes(self, data) -> str:
+        if isinstance(data, (bytes, bytearray)) and data.isascii():
+            _, ascii_map, ascii_delete = _filter_tables(
+                self.alphabet, self._filter_keep
+            )
+            return data.translate(ascii_map, ascii_delete).decode("ascii")
+        return self.filter_text(str(data, "utf-8"))
+
+    def clean_bytes(self, data) -> bytes:
+        if not isinstance(data, (bytes, bytearray)):
+            data = memoryview(data).tobytes()
+        # upper() moze z ne-ASCII znaku spravit pismeno, to riesi str cesta
+        if not data.isascii():
+            return self.clean(str(data, "utf-8")).encode("ascii")
+        return data.translate(self._clean_bytes, self._clean_delete)
+
+    def transpose_into(self, substituted: bytes, out: bytearray) -> bytearray:
+        return self.plan(len(substituted)).apply_into(substituted, out)
+
+    def untranspose_into(self, ciphertext: bytes, out: bytearray) -> bytearray:
+        return self.plan(len(ciphertext)).invert_into(ciphertext, out)
+
+    # Vstup je lubovolny buffer (bytes, bytearray, memoryview, mmap), vystup
+    # sa zapise do out (alebo noveho bytearray) a ten sa vrati
+    def encrypt_bytes(
+        self,
+        data,
+        out: Optional[bytearray] = None,
+        engine: str = "python",
+        collector=None,
+    ) -> bytearray:
+        stages = self.stages(engine)
+        run = phase_runner(collector, "encrypt")
+        filtered_text = run("filter", self.filter_bytes, data)
+        substituted = run(
+            "substitution",
+            lambda text: stages.substitute(text).encode("ascii"),
+            filtered_text,
+        )
+        out = _resize_buffer(out, len(substituted))
+        return run(
+            "transposition",
+            lambda text: stages.transpose_into(text, out),
+            substituted,
+        )
+
+    # Vysledok je text v UTF-8; out sa pouzije aj ako medzivysledok
+    def decrypt_bytes(
+        self,
+        data,
+        out: Optional[bytearray] = None,
+        engine: str = "python",
+        collector=None,
+    ) -> bytearray:
+        stages = self.stages(engine)
+        run = phase_runner(collector, "decrypt")
+        clean_cipher = run("filter", self.clean_bytes, data)
+        out = _resize_buffer(out, len(clean_cipher))
+        substituted = run(
+            "transposition",
+            lambda text: stages.untranspose_into(text, out),
+            clean_cipher,
+        )
+        plaintext = run(
+            "substitution",
+            lambda text: self.tokens.restore(stages.decode_buffer(text)),
+            substituted,
+        )
+        out[:] = plaintext.encode("utf-8")
+        return out
+
+    def encrypt(
+        self, plaintext: str, engine: str = "python", collector=None
+    ) -> Tuple[str, str, str, List[List[str]], List[str]]:
+        stages = self.stages(engine)
+        run = phase_runner(collector, "encrypt")
+        filtered_text = run("filter", self.filter_text, plaintext)
+        display_text = " ".join(filtered_text)
+
+        # Faza 1 Substitucia
+        substituted = run("substitution", stages.substitute, filtered_text)
+
+        # Faza 2 Transpozicia
+        ciphertext = run("transposition", stages.transpose, substituted)
+
+        return (
+            ciphertext,
+            display_text,
+            substituted,
+            self.matrix,
+            self.column_display(substituted),
+        )
 
-    if cipher_type == "ADFGX_CZECH":
-        alphabet = ALPHABET_CZECH_25
-        indices = ADFGX_INDICES
-        size = 5
-    elif cipher_type == "ADFGX_ENGLISH":
-        alphabet = ALPHABET_ENGLISH_25
-        indices = ADFGX_INDICES
-        size = 5
-    elif cipher_type == "ADFGVX":
-        alphabet = ALPHABET_36
-        indices = ADFGVX_INDICES
-        size = 6
-    else:
-        raise ValueError(f"Unknown cipher type: {cipher_type}")
+    def decrypt(
+        self, ciphertext: str, engine: str = "python", collector=None
+    ) -> Tuple[str, str, List[List[str]]]:
+        stages = self.stages(engine)
+        run = phase_runner(collector, "decrypt")
+
+        # Odstranim vsetko okrem ADFGX/ADFGVX znakov
+        clean_cipher = run("filter", self.clean, ciphertext)
+
+        # Faza 2 Reverzna transpozicia
+        substituted = run("transposition", stages.untranspose, clean_cipher)
+
+        # Faza 1 Reverzna substitucia
+        plaintext = run("substitution", stages.unsubstitute, substituted)
+
+        return plaintext, substituted, self.matrix
+
+
+def _resize_buffer(out: Optional[bytearray], length: int) -> bytearray:
+    if out is None:
+        return bytearray(length)
+    if len(out) > length:
+        del out[length:]
+    elif len(out) < length:
+        out.extend(bytes(length - len(out)))
+    return out
+
+
+KEY_CACHE_SIZE = 64
+
+
+class KeyCache:
+    # LRU skompilovanych klucov podla (cipher_type, matica, keyword, tokeny).
+    # CompiledCipher sa po vytvoreni nemeni, takze sa da zdielat medzi vlaknami
+    def __init__(self, maxsize: int = KEY_CACHE_SIZE):
+        if maxsize < 0:
+            raise ValueError("Cache size must not be negative")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Keyword ako v CompiledCipher, "klic" a "KLIC" su ten isty kluc
+    @staticmethod
+    def _key(cipher_type, matrix_str, keyword, tokens):
+        return (
+            cipher_type,
+            matrix_str,
+            keyword.upper(),
+            None if tokens is None else tuple(sorted(tokens.items())),
+        )
 
-    if matrix_str and len(matrix_str) == size * size:
-        matrix = create_matrix(matrix_str, size)
-    else:
-        raise ValueError(f"Matrix must have exactly {size*size} characters")
+    def get(
+        self,
+        cipher_type: str,
+        matrix_str: str,
+        keyword: str,
+        tokens: Optional[Dict[str, str]] = None,
+        order: Optional[Tuple[int, ...]] = None,
+    ) -> CompiledCipher:
+        # order (predpocitany z keywordu) nie je sucastou kluca
+        key = self._key(cipher_type, matrix_str, keyword, tokens)
+        with self._lock:
+            cipher = self._entries.get(key)
+            if cipher is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cipher
+            self.misses += 1
+
+        # Kompiluje sa mimo zamku; neplatny kluc sa neulozi
+        cipher = CompiledCipher(cipher_type, matrix_str, keyword, tokens, order)
+        if self.maxsize == 0:
+            return cipher
+
+        with self._lock:
+            # Medzitym ho mohlo skompilovat ine vlakno
+            cipher = self._entries.setdefault(key, cipher)
+            self._entries.move_to_end(key)
+            self._evict()
+        return cipher
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # Zmaze kluce, ktore sedia na vsetky zadane casti (bez argumentov vsetky)
+    def invalidate(
+        self,
+        cipher_type: Optional[str] = None,
+        matrix_str: Optional[str] = None,
+        keyword: Optional[str] = None,
+    ) -> int:
+        with self._lock:
+            removed = [
+                key
+                for key in self._entries
+                if (cipher_type is None or key[0] == cipher_type)
+                and (matrix_str is None or key[1] == matrix_str)
+                and (keyword is None or key[2] == keyword.upper())
+            ]
+            for key in removed:
+                del self._entries[key]
+        return len(removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError("Cache size must not be negative")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Spolocna cache pre compile_cipher, encrypt/decrypt a streaming
+key_cache = KeyCache()
+
+
+def compile_cipher(
+    cipher_type: str,
+    matrix_str: str,
+    keyword: str,
+    tokens: Optional[Dict[str, str]] = None,
+) -> CompiledCipher:
+    return key_cache.get(cipher_type, matrix_str, keyword, tokens)
 
-    # Odstranim vsetko okrem ADFGX/ADFGVX znakov
-    clean_cipher = "".join(c for c in ciphertext.upper() if c in indices)
 
-    # Faza 2 Reverzna transpozicia
-    substituted = transpose_decrypt(clean_cipher, keyword.upper(), len(clean_cipher))
+def encrypt(
+    plaintext: str,
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    engine: str = "python",
+    collector=None,
+    tokens: Optional[Dict[str, str]] = None,
+) -> Tuple[str, str, str, List[List[str]], List[str]]:
+    cipher = compile_cipher(cipher_type, matrix_str, keyword, tokens)
+    return cipher.encrypt(plaintext, engine, collector)
 
-    # Faza 1 Reverzna substitucia
-    plaintext = substitute_decrypt(substituted, matrix, indices)
 
-    return plaintext, substituted, matrix
+def decrypt(
+    ciphertext: str,
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    engine: str = "python",
+    collector=None,
+    tokens: Optional[Dict[str, str]] = None,
+) -> Tuple[str, str, List[List[str]]]:
+    cipher = compile_cipher(cipher_type, matrix_str, keyword, tokens)
+    return cipher.decrypt(ciphertext, engine, collector)
+
+
+def encrypt_bytes(
+    data,
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    out: Optional[bytearray] = None,
+    engine: str = "python",
+    tokens: Optional[Dict[str, str]] = None,
+) -> bytearray:
+    cipher = compile_cipher(cipher_type, matrix_str, keyword, tokens)
+    return cipher.encrypt_bytes(data, out, engine)
+
+
+def decrypt_bytes(
+    data,
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    out: Optional[bytearray] = None,
+    engine: str = "python",
+    tokens: Optional[Dict[str, str]] = None,
+) -> bytearray:
+    cipher = compile_cipher(cipher_type, matrix_str, keyword, tokens)
+    return cipher.decrypt_bytes(data, out, engine)
+
+
+# Jedna sprava pod mnohymi klucmi (napr. pri rotacii klucov). Filter aj
+# rozvinutie tokenov zavisia len od typu sifry a tokenov, takze sa spravia
+# raz; pre kazdy kluc ostane substitucia a transpozicia
+def encrypt_fanout(
+    plaintext: str,
+    keys: Iterable[Tuple[str, str]],
+    cipher_type: str,
+    engine: str = "python",
+    tokens: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    if engine not in ("python", "numpy"):
+        raise ValueError(f"Unknown engine: {engine}")
+
+    ciphers = [
+        compile_cipher(cipher_type, matrix_str, keyword, tokens)
+        for matrix_str, keyword in keys
+    ]
+    if not ciphers:
+        return []
+    filtered_text = ciphers[0].filter_text(plaintext)
+
+    # Markery su rovnake pre vsetky matice, ktore obsahuju celu abecedu
+    groups = {}
+    for position, cipher in enumerate(ciphers):
+        markers = tuple(cipher.tokens.markers.items())
+        groups.setdefault(markers, []).append(position)
+
+    results = [""] * len(ciphers)
+    for positions in groups.values():
+        group = [ciphers[position] for position in positions]
+        expanded = group[0].tokens.expand(filtered_text)
+
+        ciphertexts = None
+        if engine == "numpy":
+            import numpy_engine
+
+            if all(numpy_engine.supports(cipher) for cipher in group):
+                ciphertexts = numpy_engine.encrypt_fanout(group, expanded)
+        if ciphertexts is None:
+            ciphertexts = [
+                cipher.transpose(cipher.substitute_expanded(expanded))
+                for cipher in group
+            ]
+
+        for position, ciphertext in zip(positions, ciphertexts):
+            results[position] = ciphertext
+    return results
+
+
+# Blokovy rezim: substituovany text sa transponuje po blokoch pevnej dlzky,
+# takze pamat zavisi len od velkosti bloku, nie od velkosti vstupu
+DEFAULT_BLOCK_SIZE = 65536
+STREAM_CHUNK_SIZE = 65536
+BLOCK_HEADER = "BLOCK"
+
+
+def read_chunks(reader, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_encrypt_blocks(
+    chunks: Iterable[str],
+    cipher: CompiledCipher,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    engine: str = "python",
+) -> Iterator[str]:
+    # Parna dlzka, aby sa digraf nikdy nerozdelil medzi dva bloky
+    if block_size <= 0 or block_size % 2:
+        raise ValueError("Block size must be a positive even number")
+
+    stages = cipher.stages(engine)
+    yield f"{BLOCK_HEADER} {block_size}\n"
+
+    pending = ""
+    for chunk in chunks:
+        pending += stages.substitute(cipher.filter_text(chunk))
+
+        full = len(pending) - len(pending) % block_size
+        for start in range(0, full, block_size):
+            yield stages.transpose(pending[start : start + block_size])
+        pending = pending[full:]
+
+    if pending:
+        yield stages.transpose(pending)
+
+
+def _parse_block_header(line: str) -> int:
+    parts = line.split()
+    if len(parts) != 2 or parts[0] != BLOCK_HEADER or not parts[1].isdigit():
+        raise ValueError("Missing or invalid block header")
+
+    block_size = int(parts[1])
+    if block_size <= 0 or block_size % 2:
+        raise ValueError("Block size must be a positive even number")
+    return block_size
+
+
+def iter_decrypt_blocks(
+    chunks: Iterable[str], cipher: CompiledCipher, engine: str = "python"
+) -> Iterator[str]:
+    stages = cipher.stages(engine)
+    chunks = iter(chunks)
+
+    # Hlavicka s velkostou bloku
+    header = ""
+    for chunk in chunks:
+        header += chunk
+        if "\n" in header:
+            break
+    line, _, rest = header.partition("\n")
+    block_size = _parse_block_header(line)
+
+    pending = ""
+    tail = ""
+    for chunk in itertools.chain([rest], chunks):
+        pending += cipher.clean(chunk)
+
+        full = len(pending) - len(pending) % block_size
+        decoded = [
+            stages.decode_pairs(
+                stages.untranspose(pending[start : start + block_size])
+            )
+            for start in range(0, full, block_size)
+        ]
+        pending = pending[full:]
+
+        text, tail = cipher.tokens.split(tail + "".join(decoded), final=False)
+        if text:
+            yield text
+
+    if pending:
+        tail += stages.decode_pairs(stages.untranspose(pending))
+    text, _ = cipher.tokens.split(tail, final=True)
+    if text:
+        yield text
+
+
+def encrypt_stream(
+    reader,
+    writer,
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    engine: str = "python",
+    tokens: Optional[Dict[str, str]] = None,
+) -> None:
+    cipher = compile_cipher(cipher_type, matrix_str, keyword, tokens)
+    for block in iter_encrypt_blocks(
+        read_chunks(reader, chunk_size), cipher, block_size, engine
+    ):
+        writer.write(block)
+
+
+def decrypt_stream(
+    reader,
+    writer,
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    engine: str = "python",
+    tokens: Optional[Dict[str, str]] = None,
+) -> None:
+    cipher = compile_cipher(cipher_type, matrix_str, keyword, tokens)
+    for text in iter_decrypt_blocks(read_chunks(reader, chunk_size), cipher, engine):
+        writer.write(text)
 
 
 def format_five(text: str) -> str:
@@ -258,7 +1207,77 @@ def format_five(text: str) -> str:
     return " ".join(text[i : i + 5] for i in range(0, len(text), 5))
 
 
+FORMAT_CHUNK_SIZE = 65536
+
+
+def _format_groups(
+    text: str, group_size: int, groups_per_line: int, written: int
+) -> str:
+    groups = [text[i : i + group_size] for i in range(0, len(text), group_size)]
+    if not groups_per_line:
+        return (" " if written else "") + " ".join(groups)
+
+    # Najprv sa dokonci rozpisany riadok, potom cele riadky
+    head = -written % groups_per_line
+    lines = [" ".join(groups[:head])] if head else []
+    lines += [
+        " ".join(groups[i : i + groups_per_line])
+        for i in range(head, len(groups), groups_per_line)
+    ]
+    prefix = ("\n" if not head else " ") if written else ""
+    return prefix + "\n".join(lines)
+
+
+# format_five po castiach: v pamati je len jeden kus vstupu a jeho vystup.
+# groups_per_line > 0 zalomi riadok po danom pocte skupin
+def iter_format_five(
+    chunks,
+    group_size: int = 5,
+    groups_per_line: int = 0,
+) -> Iterator[str]:
+    if group_size <= 0:
+        raise ValueError("Group size must be positive")
+    if groups_per_line < 0:
+        raise ValueError("Groups per line must not be negative")
+
+    if isinstance(chunks, str):
+        text = chunks
+        chunks = (
+            text[i : i + FORMAT_CHUNK_SIZE]
+            for i in range(0, len(text), FORMAT_CHUNK_SIZE)
+        )
+
+    pending = ""
+    written = 0
+    for chunk in chunks:
+        pending += chunk.replace(" ", "")
+        full = len(pending) - len(pending) % group_size
+        if full:
+            yield _format_groups(pending[:full], group_size, groups_per_line, written)
+            written += full // group_size
+            pending = pending[full:]
+
+    if pending:
+        yield _format_groups(pending, group_size, groups_per_line, written)
+
+
+def write_five(
+    chunks,
+    fp,
+    group_size: int = 5,
+    groups_per_line: int = 0,
+) -> None:
+    for piece in iter_format_five(chunks, group_size, groups_per_line):
+        fp.write(piece)
+
+
 def get_remaining_chars(matrix_input: str, alphabet: str) -> str:
     used = set(matrix_input.upper())
     remaining = [c for c in alphabet if c not in used]
     return "".join(remaining)
+
+
+if __name__ == "__main__":
+    from cli import main
+
+    sys.exit(main())
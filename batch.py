@@ -0,0 +1,117 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional
+
+from adfgvx_cipher import CompiledCipher, compile_cipher
+
+BATCH_CHUNK_SIZE = 1000
+
+
+class BatchResult(NamedTuple):
+    text: Optional[str]
+    error: Optional[str]
+
+
+# Skompilovany kluc v procese workera, nastavi sa raz cez initializer
+_worker_cipher: Optional[CompiledCipher] = None
+
+
+def _init_worker(cipher: CompiledCipher) -> None:
+    global _worker_cipher
+    _worker_cipher = cipher
+
+
+def _run_chunk(
+    mode: str,
+    engine: str,
+    messages: List[str],
+    cipher: Optional[CompiledCipher] = None,
+) -> List[BatchResult]:
+    cipher = cipher or _worker_cipher
+    func = cipher.encrypt_text if mode == "encrypt" else cipher.decrypt_text
+
+    results = []
+    for message in messages:
+        # Chyba jednej spravy nezastavi cely batch
+        try:
+            results.append(BatchResult(func(message, engine), None))
+        except Exception as e:
+            results.append(BatchResult(None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _run_batch(
+    mode: str,
+    messages: Iterable[str],
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    workers: Optional[int],
+    chunk_size: int,
+    engine: str,
+) -> List[BatchResult]:
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive")
+
+    cipher = compile_cipher(cipher_type, matrix_str, keyword)
+
+    messages = list(messages)
+    chunks = [
+        messages[i : i + chunk_size] for i in range(0, len(messages), chunk_size)
+    ]
+
+    if (workers is not None and workers <= 1) or len(chunks) <= 1:
+        chunk_results = [_run_chunk(mode, engine, chunk, cipher) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(cipher,)
+        ) as pool:
+            # map vracia vysledky v poradi vstupu
+            chunk_results = list(
+                pool.map(
+                    _run_chunk, [mode] * len(chunks), [engine] * len(chunks), chunks
+                )
+            )
+
+    return [result for chunk in chunk_results for result in chunk]
+
+
+def encrypt_many(
+    messages: Iterable[str],
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    workers: Optional[int] = None,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    engine: str = "python",
+) -> List[BatchResult]:
+    return _run_batch(
+        "encrypt",
+        messages,
+        matrix_str,
+        keyword,
+        cipher_type,
+        workers,
+        chunk_size,
+        engine,
+    )
+
+
+def decrypt_many(
+    ciphertexts: Iterable[str],
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    workers: Optional[int] = None,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    engine: str = "python",
+) -> List[BatchResult]:
+    return _run_batch(
+        "decrypt",
+        ciphertexts,
+        matrix_str,
+        keyword,
+        cipher_type,
+        workers,
+        chunk_size,
+        engine,
+    )
@@ -0,0 +1,299 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy_engine
+from adfgvx_cipher import (
+    CIPHER_VARIANTS,
+    compile_cipher,
+    decrypt,
+    encrypt,
+    filter_input,
+    remove_diacritics,
+    resolve_cipher_type,
+    substitute_decrypt,
+    substitute_encrypt,
+    transpose_decrypt,
+    transpose_encrypt,
+)
+
+CIPHER_TYPES = list(CIPHER_VARIANTS)
+ENGINES = ["python", "numpy"]
+DEFAULT_SIZES = [100, 10_000, 1_000_000, 100_000_000]
+DEFAULT_KEY_LENGTHS = [3, 5, 8, 12, 20]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+
+WORDS = [
+    "ahoj",
+    "svete",
+    "příliš",
+    "žluťoučký",
+    "kůň",
+    "úpěl",
+    "ďábelské",
+    "ódy",
+    "the",
+    "quick",
+    "brown",
+    "fox",
+    "jumps",
+    "over",
+    "lazy",
+    "dog",
+    "wizard",
+    "jazz",
+    "2024",
+    "10",
+    "kvalita",
+    "šifra",
+    "zpráva",
+    "tajné",
+    "heslo",
+]
+BASE_TEXT_SIZE = 1_000_000
+
+
+def generate_text(size: int, seed: int) -> str:
+    # Zaklad sa generuje raz a opakuje, 100 MB nahodnych slov by trvalo dlho
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < min(size, BASE_TEXT_SIZE):
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    base = " ".join(words)
+    return (base * (size // len(base) + 1))[:size]
+
+
+def generate_matrix(alphabet: str, seed: int) -> str:
+    chars = list(alphabet)
+    random.Random(seed).shuffle(chars)
+    return "".join(chars)
+
+
+def generate_keyword(length: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(length))
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(
+    sizes: List[int],
+    key_lengths: List[int],
+    cipher_types: List[str],
+    repeat: int,
+    seed: int,
+    engines: List[str],
+    log=None,
+) -> List[Dict]:
+    results = []
+
+    def record(stage, cipher_type, size, key_length, func, engine="python"):
+        seconds = measure(func, repeat)
+        result = {
+            "stage": stage,
+            "cipher_type": cipher_type,
+            "engine": engine,
+            "size": size,
+            "key_length": key_length,
+            "seconds": seconds,
+            "throughput": size / seconds if seconds > 0 else float("inf"),
+        }
+        results.append(result)
+        if log is not None:
+            print(
+                f"{stage:20} {cipher_type or '-':14} {engine:6} size={size:<10} "
+                f"key={key_length!s:<4} {result['throughput'] / 1e6:10.3f} MB/s",
+                file=log,
+            )
+
+    for size in sizes:
+        text = generate_text(size, seed)
+        record("remove_diacritics", None, size, None, lambda: remove_diacritics(text))
+
+        for cipher_type in cipher_types:
+            alphabet, indices, matrix_size = resolve_cipher_type(cipher_type)
+            matrix_str = generate_matrix(alphabet, seed)
+            cipher = compile_cipher(cipher_type, matrix_str, "KEY")
+            matrix = cipher.matrix
+
+            # Vstupy jednotlivych faz sa pripravia rychlou cestou
+            filtered, _ = filter_input(text, alphabet)
+            substituted = cipher.substitute(filtered)
+
+            record(
+                "filter_input",
+                cipher_type,
+                size,
+                None,
+                lambda: filter_input(text, alphabet),
+            )
+            record(
+                "substitute_encrypt",
+                cipher_type,
+                size,
+                None,
+                lambda: substitute_encrypt(filtered, matrix, indices),
+            )
+            record(
+                "substitute_decrypt",
+                cipher_type,
+                size,
+                None,
+                lambda: substitute_decrypt(substituted, matrix, indices),
+            )
+
+            for key_length in key_lengths:
+                keyword = generate_keyword(key_length, seed + key_length)
+                ciphertext, _ = transpose_encrypt(substituted, keyword)
+
+                record(
+                    "transpose_encrypt",
+                    cipher_type,
+                    size,
+                    key_length,
+                    lambda: transpose_encrypt(substituted, keyword),
+                )
+                record(
+                    "transpose_decrypt",
+                    cipher_type,
+                    size,
+                    key_length,
+                    lambda: transpose_decrypt(ciphertext, keyword, len(ciphertext)),
+                )
+                for engine in engines:
+                    # Bez NumPy alebo s ne-ASCII maticou by stages("numpy")
+                    # potichu bezal v Pythone a riadok by klamal
+                    if engine == "numpy" and not numpy_engine.supports(cipher):
+                        continue
+                    record(
+                        "encrypt",
+                        cipher_type,
+                        size,
+                        key_length,
+                        lambda: encrypt(
+                            text, matrix_str, keyword, cipher_type, engine
+                        ),
+                        engine,
+                    )
+                    record(
+                        "decrypt",
+                        cipher_type,
+                        size,
+                        key_length,
+                        lambda: decrypt(
+                            ciphertext, matrix_str, keyword, cipher_type, engine
+                        ),
+                        engine,
+                    )
+
+    return results
+
+
+def _case_key(result: Dict):
+    return (
+        result["stage"],
+        result["cipher_type"],
+        result.get("engine", "python"),
+        result["size"],
+        result["key_length"],
+    )
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[str]:
+    # Regresia = priepustnost klesla o viac ako threshold oproti baseline
+    previous = {_case_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(_case_key(result))
+        if old is None:
+            continue
+        if result["throughput"] < old["throughput"] * (1 - threshold):
+            stage, cipher_type, engine, size, key_length = _case_key(result)
+            regressions.append(
+                f"{stage} {cipher_type} {engine} size={size} key={key_length}: "
+                f"{result['throughput'] / 1e6:.3f} MB/s "
+                f"(baseline {old['throughput'] / 1e6:.3f} MB/s)"
+            )
+    return regressions
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the cipher pipeline.")
+    parser.add_argument(
+        "--sizes", type=_int_list, default=DEFAULT_SIZES, help="e.g. 100,10000"
+    )
+    parser.add_argument(
+        "--key-lengths", type=_int_list, default=DEFAULT_KEY_LENGTHS, help="e.g. 3,8"
+    )
+    parser.add_argument(
+        "--types", nargs="+", choices=CIPHER_TYPES, default=CIPHER_TYPES
+    )
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed throughput drop versus baseline (0.2 = 20%%)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.sizes,
+        args.key_lengths,
+        args.types,
+        args.repeat,
+        args.seed,
+        args.engines,
+        log=sys.stderr,
+    )
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
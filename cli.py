@@ -0,0 +1,168 @@
+import argparse
+import mmap
+import os
+import sys
+
+# Bez tkinter, aby CLI fungovalo aj na serveroch bez GUI
+from adfgvx_cipher import (
+    BLOCK_HEADER,
+    CIPHER_VARIANTS,
+    compile_cipher,
+    iter_decrypt_blocks,
+    iter_encrypt_blocks,
+    read_chunks,
+    write_five,
+)
+from container import decrypt_packed, encrypt_packed, is_packed
+
+CIPHER_TYPES = list(CIPHER_VARIANTS)
+
+
+# Pri desifrovani sa zabaleny kontajner (container.py) vrati ako bytes,
+# inak vzdy text
+def read_input(path, detect_packed=False):
+    if path is None or path == "-":
+        data = sys.stdin.buffer.read()
+        return data if detect_packed and is_packed(data) else str(data, "utf-8")
+
+    with open(path, "rb") as f:
+        # Prazdny subor sa neda namapovat
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if detect_packed and is_packed(mm):
+                return bytes(mm)
+            return str(mm, "utf-8")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m adfgvx_cipher",
+        description="Encrypt or decrypt text with the ADFGX/ADFGVX cipher.",
+    )
+    parser.add_argument("mode", choices=["encrypt", "decrypt"])
+    parser.add_argument("-k", "--keyword", required=True, help="transposition key")
+    parser.add_argument(
+        "-m", "--matrix", required=True, help="matrix alphabet (size x size characters)"
+    )
+    parser.add_argument(
+        "-t", "--type", dest="cipher_type", choices=CIPHER_TYPES, default="ADFGVX"
+    )
+    parser.add_argument(
+        "-i", "--input", help="input file (memory-mapped), default stdin"
+    )
+    parser.add_argument("-o", "--output", help="output file, default stdout")
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["raw", "five", "packed"],
+        default="raw",
+        help="output as is, in groups of five or as a packed binary container "
+        "(decrypt detects packed and block input by itself)",
+    )
+    parser.add_argument(
+        "--groups-per-line",
+        type=int,
+        default=0,
+        help="with -f five, break the line after this many groups (0 = one line)",
+    )
+    parser.add_argument(
+        "--engine", choices=["python", "numpy"], default="python"
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        help="fixed-block streaming mode, with -f packed the block size of the "
+        "container (decrypt reads the size from the header)",
+    )
+    return parser
+
+
+def run_blocks(args, writer) -> None:
+    cipher = compile_cipher(args.cipher_type, args.matrix.upper(), args.keyword)
+    reader = (
+        sys.stdin
+        if args.input in (None, "-")
+        else open(args.input, encoding="utf-8")
+    )
+    try:
+        chunks = read_chunks(reader)
+        if args.mode == "encrypt":
+            output = iter_encrypt_blocks(chunks, cipher, args.block_size, args.engine)
+            # Hlavicka BLOCK ostava na vlastnom riadku, do skupin ide len text
+            writer.write(next(output))
+        else:
+            output = iter_decrypt_blocks(chunks, cipher, args.engine)
+
+        if args.format == "five":
+            write_five(output, writer, groups_per_line=args.groups_per_line)
+        else:
+            for piece in output:
+                writer.write(piece)
+    finally:
+        if reader is not sys.stdin:
+            reader.close()
+
+
+def run(args, writer) -> None:
+    text = read_input(args.input, args.mode == "decrypt")
+
+    # Typ sifry je v hlavicke kontajnera, -t sa pri nom nepouziva
+    if isinstance(text, bytes):
+        result = decrypt_packed(text, args.matrix.upper(), args.keyword, args.engine)
+    else:
+        cipher = compile_cipher(args.cipher_type, args.matrix.upper(), args.keyword)
+        if args.mode == "encrypt" and args.format == "packed":
+            packed = encrypt_packed(
+                text,
+                cipher.matrix_str,
+                cipher.keyword,
+                cipher.cipher_type,
+                args.block_size or 0,
+                args.engine,
+            )
+            writer.flush()
+            writer.buffer.write(packed)
+            return
+        if args.mode == "encrypt":
+            result = cipher.encrypt_text(text, args.engine)
+        elif text.startswith(BLOCK_HEADER):
+            # Vystup blokoveho rezimu aj bez --block-size, velkost je v hlavicke
+            result = "".join(iter_decrypt_blocks([text], cipher, args.engine))
+        else:
+            result = cipher.decrypt_text(text, args.engine)
+
+    # Skupiny sa zapisuju po castiach, bez kopie celeho vysledku
+    if args.format == "five":
+        write_five(result, writer, groups_per_line=args.groups_per_line)
+    else:
+        writer.write(result)
+    writer.write("\n")
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    writer = (
+        sys.stdout
+        if args.output in (None, "-")
+        else open(args.output, "w", encoding="utf-8")
+    )
+    try:
+        # Kontajner si velkost bloku uklada sam, bloky sa nestreamuju
+        packed = args.mode == "encrypt" and args.format == "packed"
+        if args.block_size is not None and not packed:
+            run_blocks(args, writer)
+        else:
+            run(args, writer)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if writer is not sys.stdout:
+            writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
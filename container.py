@@ -0,0 +1,263 @@
+import struct
+import zlib
+from functools import lru_cache
+from itertools import product
+from typing import List, NamedTuple, Tuple
+
+from adfgvx_cipher import (
+    BLOCK_HEADER,
+    _parse_block_header,
+    compile_cipher,
+    get_variant,
+)
+
+# Binarny kontajner sifrovaneho textu:
+#   hlavicka | meno typu sifry (ASCII) | symboly zabalene po skupinach
+# Symbol A/D/F/G/(V/X...) je cislica v sustave so zakladom velkosti matice,
+# skupina cislic sa ulozi ako jedno cislo na pevny pocet bajtov
+# Prvy bajt nie je ASCII, takze magic sa nemoze objavit v textovom
+# sifrovanom texte (napr. ADFXV...)
+MAGIC = b"\x89ADF"
+VERSION = 1
+# magic, verzia, zaklad, dlzka mena typu, rezerva, velkost bloku (0 = bez
+# blokov), pocet symbolov, crc32 tela
+HEADER = struct.Struct("<4sBBBxIQI")
+# Najvacsia skupina v bajtoch, aby cisla skupiny ostali male
+MAX_GROUP_BYTES = 16
+# Tabulka pre rozklad cisla na cislice ma najviac tolko poloziek
+DIGIT_TABLE_SIZE = 4096
+
+
+class ContainerHeader(NamedTuple):
+    cipher_type: str
+    base: int
+    block_size: int
+    symbol_count: int
+    checksum: int
+    body_offset: int
+
+
+def _packed_len(base: int, count: int) -> int:
+    return ((base**count - 1).bit_length() + 7) // 8
+
+
+# (symbolov v skupine, bajtov skupiny) s najmensim poctom bitov na symbol,
+# napr. ADFGVX 34 symbolov v 11 bajtoch (~2.59 bitu), ADFGX 31 v 9 (~2.32)
+@lru_cache(maxsize=None)
+def group_shape(base: int) -> Tuple[int, int]:
+    best = None
+    for n in range(1, MAX_GROUP_BYTES + 1):
+        k = 1
+        while base ** (k + 1) <= 256**n:
+            k += 1
+        if best is None or n * best[0] < best[1] * k:
+            best = (k, n)
+    return best
+
+
+def packed_size(base: int, count: int) -> int:
+    k, n = group_shape(base)
+    full, rest = divmod(count, k)
+    return full * n + (_packed_len(base, rest) if rest else 0)
+
+
+@lru_cache(maxsize=32)
+def _symbol_tables(indices: Tuple[str, ...]):
+    letters = "".join(indices).encode("ascii")
+    digits = bytes(ord("0") + i for i in range(len(indices)))
+    to_digits = bytes.maketrans(letters, digits)
+    # Rovnake cistenie ako CompiledCipher.clean_bytes
+    clean_delete = bytes(
+        code for code in range(256) if chr(code).upper() not in indices
+    )
+
+    # Cislo 0..base**width-1 -> jeho cislice uz ako pismena indexov
+    width = 1
+    while len(indices) ** (width + 1) <= DIGIT_TABLE_SIZE:
+        width += 1
+    to_letters = [bytes(p) for p in product(letters, repeat=width)]
+    return to_digits, clean_delete, to_letters, width
+
+
+def pack_symbols(symbols: bytes, indices: List[str]) -> bytes:
+    base = len(indices)
+    to_digits, _, _, _ = _symbol_tables(tuple(indices))
+    digits = symbols.translate(to_digits)
+    k, n = group_shape(base)
+
+    full = len(digits) - len(digits) % k
+    body = [
+        int(digits[start : start + k], base).to_bytes(n, "big")
+        for start in range(0, full, k)
+    ]
+    if full < len(digits):
+        rest = len(digits) - full
+        body.append(int(digits[full:], base).to_bytes(_packed_len(base, rest), "big"))
+    return b"".join(body)
+
+
+# Skupiny sa rozkladaju naraz po cislicovych stlpcoch (o width cislic),
+# co je rychlejsie ako delit kazdu skupinu zvlast
+def _unpack_groups(values: List[int], count: int, indices: List[str]) -> bytes:
+    base = len(indices)
+    _, _, to_letters, width = _symbol_tables(tuple(indices))
+    modulus = base**width
+
+    columns = []
+    while count > width:
+        columns.append([to_letters[value % modulus] for value in values])
+        values = [value // modulus for value in values]
+        count -= width
+    # Najvyssie cislice skupiny, bez nul navyse
+    if values and max(values) >= base**count:
+        raise ValueError("Corrupted container body")
+    columns.append([to_letters[value][width - count :] for value in values])
+    columns.reverse()
+    return b"".join(b"".join(pieces) for pieces in zip(*columns))
+
+
+def unpack_symbols(body, indices: List[str], count: int) -> bytes:
+    base = len(indices)
+    k, n = group_shape(base)
+    if len(body) != packed_size(base, count):
+        raise ValueError("Container body has wrong length")
+
+    body = memoryview(body)
+    full = count // k
+    symbols = _unpack_groups(
+        [int.from_bytes(body[i : i + n], "big") for i in range(0, full * n, n)],
+        k,
+        indices,
+    )
+    if count > full * k:
+        symbols += _unpack_groups(
+            [int.from_bytes(body[full * n :], "big")], count - full * k, indices
+        )
+    return symbols
+
+
+def is_packed(data) -> bool:
+    return bytes(data[: len(MAGIC)]) == MAGIC
+
+
+def read_header(data) -> ContainerHeader:
+    if len(data) < HEADER.size or not is_packed(data):
+        raise ValueError("Not a packed ciphertext container")
+
+    magic, version, base, name_len, block_size, count, checksum = (
+        HEADER.unpack_from(data)
+    )
+    if version != VERSION:
+        raise ValueError(f"Unsupported container version: {version}")
+
+    offset = HEADER.size + name_len
+    if len(data) < offset:
+        raise ValueError("Truncated container header")
+    cipher_type = bytes(data[HEADER.size : offset]).decode("ascii")
+    if get_variant(cipher_type).size != base:
+        raise ValueError(f"Container base does not match {cipher_type}")
+    if block_size % 2:
+        raise ValueError("Block size must be a positive even number")
+    return ContainerHeader(cipher_type, base, block_size, count, checksum, offset)
+
+
+def _build(symbols: bytes, cipher_type: str, block_size: int) -> bytes:
+    variant = get_variant(cipher_type)
+    if block_size < 0 or block_size % 2:
+        raise ValueError("Block size must be a positive even number")
+
+    body = pack_symbols(symbols, variant.indices)
+    name = cipher_type.encode("ascii")
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        variant.size,
+        len(name),
+        block_size,
+        len(symbols),
+        zlib.crc32(body),
+    )
+    return header + name + body
+
+
+# Zabali hotovy sifrovany text; text z blokoveho rezimu (s hlavickou
+# BLOCK) si velkost bloku ponecha
+def pack(ciphertext, cipher_type: str, block_size: int = 0) -> bytes:
+    if isinstance(ciphertext, str):
+        if ciphertext.startswith(BLOCK_HEADER):
+            line, _, ciphertext = ciphertext.partition("\n")
+            block_size = _parse_block_header(line)
+        ciphertext = ciphertext.upper().encode("ascii", "ignore")
+
+    _, clean_delete, _, _ = _symbol_tables(tuple(get_variant(cipher_type).indices))
+    symbols = bytes(ciphertext).upper().translate(None, clean_delete)
+    return _build(symbols, cipher_type, block_size)
+
+
+# Vrati hlavicku a symboly ako ASCII bajty (pismena indexov)
+def unpack(data) -> Tuple[ContainerHeader, bytes]:
+    header = read_header(data)
+    body = memoryview(data)[header.body_offset :]
+    if zlib.crc32(body) != header.checksum:
+        raise ValueError("Container checksum mismatch")
+
+    indices = get_variant(header.cipher_type).indices
+    return header, unpack_symbols(body, indices, header.symbol_count)
+
+
+def encrypt_packed(
+    plaintext: str,
+    matrix_str: str,
+    keyword: str,
+    cipher_type: str,
+    block_size: int = 0,
+    engine: str = "python",
+    tokens=None,
+) -> bytes:
+    if block_size < 0 or block_size % 2:
+        raise ValueError("Block size must be a positive even number")
+
+    cipher = compile_cipher(cipher_type, matrix_str, keyword, tokens)
+    stages = cipher.stages(engine)
+    substituted = stages.substitute(cipher.filter_text(plaintext)).encode("ascii")
+
+    step = block_size or max(len(substituted), 1)
+    symbols = bytearray(len(substituted))
+    for start in range(0, len(substituted), step):
+        block = substituted[start : start + step]
+        symbols[start : start + len(block)] = stages.transpose_into(
+            block, bytearray(len(block))
+        )
+    return _build(bytes(symbols), cipher_type, block_size)
+
+
+# Typ sifry aj bloky sa beru z hlavicky, symboly idu rovno do transpozicie
+# bez cistenia textu
+def decrypt_packed(
+    data,
+    matrix_str: str,
+    keyword: str,
+    engine: str = "python",
+    tokens=None,
+) -> str:
+    header, symbols = unpack(data)
+    cipher = compile_cipher(header.cipher_type, matrix_str, keyword, tokens)
+    stages = cipher.stages(engine)
+
+    step = header.block_size or max(len(symbols), 1)
+    decoded = []
+    for start in range(0, len(symbols), step):
+        block = symbols[start : start + step]
+        decoded.append(
+            stages.decode_buffer(stages.untranspose_into(block, bytearray(len(block))))
+        )
+    return cipher.tokens.restore("".join(decoded))
+
+
+def unpack_text(data) -> str:
+    header, symbols = unpack(data)
+    text = symbols.decode("ascii")
+    if header.block_size:
+        return f"{BLOCK_HEADER} {header.block_size}\n{text}"
+    return text
+
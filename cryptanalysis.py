@@ -0,0 +1,428 @@
+import heapq
+import math
+import operator
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from adfgvx_cipher import (
+    SPACE_MARKER,
+    compile_cipher,
+    normalize_by_language,
+    resolve_cipher_type,
+    substitute_decrypt,
+    transpose_decrypt,
+)
+
+# Do tejto dlzky kluca sa skusaju vsetky poradia stlpcov, nad nou hill-climbing
+EXHAUSTIVE_LIMIT = 8
+HILL_CLIMB_RESTARTS = 32
+
+# Priblizne frekvencie pismen v percentach
+ENGLISH_FREQUENCIES = {
+    "A": 8.17,
+    "B": 1.49,
+    "C": 2.78,
+    "D": 4.25,
+    "E": 12.70,
+    "F": 2.23,
+    "G": 2.02,
+    "H": 6.09,
+    "I": 6.97,
+    "J": 0.15,
+    "K": 0.77,
+    "L": 4.03,
+    "M": 2.41,
+    "N": 6.75,
+    "O": 7.51,
+    "P": 1.93,
+    "Q": 0.10,
+    "R": 5.99,
+    "S": 6.33,
+    "T": 9.06,
+    "U": 2.76,
+    "V": 0.98,
+    "W": 2.36,
+    "X": 0.15,
+    "Y": 1.97,
+    "Z": 0.07,
+}
+
+# Cestina bez diakritiky (á -> A, ř -> R, ...)
+CZECH_FREQUENCIES = {
+    "A": 8.40,
+    "B": 1.60,
+    "C": 3.00,
+    "D": 3.60,
+    "E": 9.90,
+    "F": 0.30,
+    "G": 0.30,
+    "H": 1.30,
+    "I": 7.20,
+    "J": 2.10,
+    "K": 3.70,
+    "L": 3.80,
+    "M": 3.20,
+    "N": 6.60,
+    "O": 8.70,
+    "P": 3.40,
+    "Q": 0.01,
+    "R": 4.90,
+    "S": 5.90,
+    "T": 5.70,
+    "U": 3.90,
+    "V": 4.40,
+    "W": 0.07,
+    "X": 0.08,
+    "Y": 2.80,
+    "Z": 3.20,
+}
+
+DIGIT_FREQUENCY = 0.10
+# Medzera je v desifrovanom texte ako SPACE_MARKER, kazdy jeho znak sa pocita
+SPACE_FREQUENCY = 18.0
+# Interpunkcia v abecede (ADFGVXZ, ADFGKVXZ_CZECH) nema v tabulkach frekvenciu
+PUNCTUATION_FREQUENCY = 0.05
+# Cely SPACE_MARKER v texte znamena spravne susedne stlpce; samotne frekvencie
+# pismen nerozlisia poradia, ktore len prehodia dvojice stlpcov
+MARKER_BONUS = 10.0
+MARKER_FRAGMENTS = [SPACE_MARKER[i : i + 4] for i in range(len(SPACE_MARKER) - 3)]
+
+
+class TranspositionCandidate(NamedTuple):
+    score: float
+    keyword: str
+    order: Tuple[int, ...]
+    plaintext: str
+
+
+def letter_log_probs(alphabet: str, language: str = "english") -> Dict[str, float]:
+    if language == "english":
+        frequencies = ENGLISH_FREQUENCIES
+    elif language == "czech":
+        frequencies = CZECH_FREQUENCIES
+    else:
+        raise ValueError(f"Unknown language: {language}")
+
+    # W/J sa zlozia do V/I podla abecedy, ako pri filtrovani vstupu
+    counts = dict.fromkeys(alphabet, 0.0)
+    for letter, frequency in frequencies.items():
+        letter = normalize_by_language(letter, alphabet)
+        if letter in counts:
+            counts[letter] += frequency
+    for char in alphabet:
+        if char.isdigit():
+            counts[char] += DIGIT_FREQUENCY
+    # Abeceda s medzerou ju sifruje priamo, bez SPACE_MARKER
+    if " " in counts:
+        counts[" "] += SPACE_FREQUENCY
+    else:
+        for char in SPACE_MARKER:
+            if char in counts:
+                counts[char] += SPACE_FREQUENCY
+    for char, count in counts.items():
+        if not count:
+            counts[char] = PUNCTUATION_FREQUENCY
+
+    total = sum(counts.values())
+    return {char: math.log(count / total) for char, count in counts.items()}
+
+
+def keyword_for_order(order: Sequence[int]) -> str:
+    # Keyword, ktoreho abecedne poradie stlpcov je presne order
+    if len(order) > 26:
+        raise ValueError("Key length must be at most 26")
+    keyword = [""] * len(order)
+    for rank, column in enumerate(order):
+        keyword[column] = chr(ord("A") + rank)
+    return "".join(keyword)
+
+
+class _ColumnSearch:
+    # Hodnotenie poradia stlpcov bez skladania celeho textu: digrafy sa
+    # zoskupia podla dvojice stlpcov, z ktorych pochadzaju, a kazda skupina
+    # sa cita slicingom zo segmentov ciphertextu
+    def __init__(
+        self,
+        ciphertext: str,
+        key_len: int,
+        matrix_str: str,
+        indices: List[str],
+        log_probs: Dict[str, float],
+        floor: float,
+    ):
+        self.ciphertext = ciphertext
+        self.key_len = key_len
+
+        length = len(ciphertext)
+        base_len, extra = divmod(length, key_len)
+        self.lengths = [base_len + (1 if c < extra else 0) for c in range(key_len)]
+
+        # digraf -> log pravdepodobnost znaku v matici
+        size = len(indices)
+        self.digraph_scores = {}
+        self.decode_table = {}
+        for pos, char in enumerate(matrix_str):
+            digraph = indices[pos // size] + indices[pos % size]
+            self.digraph_scores[digraph] = log_probs.get(char, floor)
+            self.decode_table[digraph] = char
+        self.best_pair = max(self.digraph_scores.values())
+        self.max_bonus = MARKER_BONUS * (length // 2 // len(SPACE_MARKER))
+
+        rows = {}
+        for m in range(length // 2):
+            row_a, col_a = divmod(2 * m, key_len)
+            row_b, col_b = divmod(2 * m + 1, key_len)
+            rows.setdefault((col_a, col_b), []).append((row_a, row_b))
+
+        # (stlpec a, stlpec b, prvy riadok a, prvy riadok b, krok, pocet)
+        self.groups = []
+        for (col_a, col_b), pairs in rows.items():
+            step = pairs[1][0] - pairs[0][0] if len(pairs) > 1 else 1
+            self.groups.append(
+                (col_a, col_b, pairs[0][0], pairs[0][1], step, len(pairs))
+            )
+        self.total_pairs = length // 2
+
+        self.column_groups = [[] for _ in range(key_len)]
+        for group in self.groups:
+            self.column_groups[group[0]].append(group)
+            if group[1] != group[0]:
+                self.column_groups[group[1]].append(group)
+
+    def group_score(self, group, starts) -> float:
+        col_a, col_b, row_a, row_b, step, count = group
+        start_a = starts[col_a] + row_a
+        start_b = starts[col_b] + row_b
+        a = self.ciphertext[start_a : start_a + step * count : step]
+        b = self.ciphertext[start_b : start_b + step * count : step]
+        return sum(map(self.digraph_scores.__getitem__, map(operator.add, a, b)))
+
+    def starts(self, order: Sequence[int]) -> List[int]:
+        starts = [0] * self.key_len
+        pos = 0
+        for column in order:
+            starts[column] = pos
+            pos += self.lengths[column]
+        return starts
+
+    def decode(self, order: Sequence[int]) -> str:
+        key_len = self.key_len
+        substituted = [""] * len(self.ciphertext)
+        pos = 0
+        for column in order:
+            length = self.lengths[column]
+            substituted[column::key_len] = self.ciphertext[pos : pos + length]
+            pos += length
+        pairs = map(operator.add, substituted[0::2], substituted[1::2])
+        return "".join(map(self.decode_table.__getitem__, pairs))
+
+    def bonus(self, order: Sequence[int]) -> float:
+        return MARKER_BONUS * self.decode(order).count(SPACE_MARKER)
+
+    # Pre hill-climbing: aj casti SPACE_MARKER, aby skore rastlo plynulejsie
+    def guide_bonus(self, order: Sequence[int]) -> float:
+        text = self.decode(order)
+        fragments = sum(text.count(fragment) for fragment in MARKER_FRAGMENTS)
+        return MARKER_BONUS / len(MARKER_FRAGMENTS) * fragments
+
+    def letters_score(self, order: Sequence[int]) -> float:
+        starts = self.starts(order)
+        return sum(self.group_score(group, starts) for group in self.groups)
+
+    def score(self, order: Sequence[int]) -> float:
+        return self.letters_score(order) + self.bonus(order)
+
+    # Vsetky poradia zacinajuce prefixom, branch and bound voci threshold
+    def exhaustive(
+        self, prefix: Tuple[int, ...], threshold: float, top: int
+    ) -> List[Tuple[float, Tuple[int, ...]]]:
+        key_len = self.key_len
+        starts = [None] * key_len
+        order = []
+        best = []  # min-heap (score, order)
+        limit = [threshold]
+        bonus = self.max_bonus
+
+        def place(column, pos):
+            starts[column] = pos
+            order.append(column)
+            gained = 0.0
+            done = 0
+            for group in self.column_groups[column]:
+                if starts[group[0]] is None or starts[group[1]] is None:
+                    continue
+                gained += self.group_score(group, starts)
+                done += group[5]
+            return pos + self.lengths[column], gained, done
+
+        def unplace(column):
+            starts[column] = None
+            order.pop()
+
+        def descend(pos, score, remaining):
+            if len(order) == key_len:
+                item = (score + self.bonus(order), tuple(order))
+                if len(best) < top:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+                if len(best) == top:
+                    limit[0] = max(limit[0], best[0][0])
+                return
+
+            for column in range(key_len):
+                if starts[column] is not None:
+                    continue
+                next_pos, gained, done = place(column, pos)
+                new_score = score + gained
+                new_remaining = remaining - done
+                # Orezanie: ani najlepsie mozne zvysne digrafy nedosiahnu limit
+                if new_score + new_remaining * self.best_pair + bonus >= limit[0]:
+                    descend(next_pos, new_score, new_remaining)
+                unplace(column)
+
+        pos, score, remaining = 0, 0.0, self.total_pairs
+        for column in prefix:
+            pos, gained, done = place(column, pos)
+            score += gained
+            remaining -= done
+        if score + remaining * self.best_pair + bonus >= limit[0]:
+            descend(pos, score, remaining)
+
+        return sorted(best, reverse=True)
+
+    def hill_climb(self, seed: int) -> Tuple[float, Tuple[int, ...]]:
+        rng = random.Random(seed)
+        order = list(range(self.key_len))
+        rng.shuffle(order)
+        score = self.letters_score(order) + self.guide_bonus(order)
+
+        # Vymena dvoch stlpcov alebo presun stlpca na inu poziciu
+        improved = True
+        while improved:
+            improved = False
+            for i in range(self.key_len):
+                for j in range(self.key_len):
+                    if i == j:
+                        continue
+                    candidate = list(order)
+                    if i < j:
+                        candidate[i], candidate[j] = candidate[j], candidate[i]
+                    else:
+                        candidate.insert(j, candidate.pop(i))
+                    candidate_score = self.letters_score(
+                        candidate
+                    ) + self.guide_bonus(candidate)
+                    if candidate_score > score:
+                        order, score = candidate, candidate_score
+                        improved = True
+
+        return self.score(order), tuple(order)
+
+
+# Stav vyhladavania v procese workera
+_worker_search: Optional[_ColumnSearch] = None
+
+
+def _init_worker(search: _ColumnSearch) -> None:
+    global _worker_search
+    _worker_search = search
+
+
+def _exhaustive_task(prefix, threshold, top):
+    return _worker_search.exhaustive(prefix, threshold, top)
+
+
+def _hill_climb_task(seed):
+    return _worker_search.hill_climb(seed)
+
+
+def attack_transposition(
+    ciphertext: str,
+    matrix_str: str,
+    cipher_type: str,
+    key_length: int,
+    language: Optional[str] = None,
+    workers: Optional[int] = None,
+    exhaustive_limit: int = EXHAUSTIVE_LIMIT,
+    restarts: int = HILL_CLIMB_RESTARTS,
+    top: int = 5,
+    scorer: Optional[Callable[[str], float]] = None,
+    seed: Optional[int] = None,
+) -> List[TranspositionCandidate]:
+    alphabet, indices, size = resolve_cipher_type(cipher_type)
+    if key_length < 1:
+        raise ValueError("Key length must be positive")
+    if language is None:
+        language = "czech" if cipher_type == "ADFGX_CZECH" else "english"
+
+    # Kontrola matice + vycistenie ciphertextu
+    cipher = compile_cipher(cipher_type, matrix_str, "A")
+    clean = cipher.clean(ciphertext)
+
+    log_probs = letter_log_probs(alphabet, language)
+    search = _ColumnSearch(
+        clean, key_length, matrix_str, indices, log_probs, min(log_probs.values())
+    )
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(32) for _ in range(max(1, restarts))]
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(search,)
+    ) as pool:
+        found = list(pool.map(_hill_climb_task, seeds))
+
+        if key_length <= exhaustive_limit:
+            # Najlepsi hill-climbing vysledok je dolna hranica pre orezanie
+            threshold = max(score for score, _ in found)
+            depth = min(2, key_length - 1)
+            prefixes = [()]
+            for _ in range(depth):
+                prefixes = [
+                    p + (c,) for p in prefixes for c in range(key_length) if c not in p
+                ]
+            for results in pool.map(
+                _exhaustive_task,
+                prefixes,
+                [threshold] * len(prefixes),
+                [top] * len(prefixes),
+            ):
+                found.extend(results)
+
+    candidates = {}
+    for score, order in found:
+        candidates[order] = score
+    ranked = sorted(candidates.items(), key=lambda item: item[1], reverse=True)
+
+    results = []
+    matrix = cipher.matrix
+    for order, score in ranked[: top if scorer is None else 4 * top]:
+        keyword = keyword_for_order(order)
+        substituted = transpose_decrypt(clean, keyword, len(clean))
+        plaintext = substitute_decrypt(substituted, matrix, indices)
+        if scorer is not None:
+            score = scorer(plaintext)
+        results.append(TranspositionCandidate(score, keyword, order, plaintext))
+
+    results.sort(key=lambda candidate: candidate.score, reverse=True)
+    return results[:top]
+
+
+def attack_key_lengths(
+    ciphertext: str,
+    matrix_str: str,
+    cipher_type: str,
+    key_lengths: Sequence[int],
+    **kwargs,
+) -> List[TranspositionCandidate]:
+    # Najlepsi kandidat pre kazdu dlzku kluca, zoradene podla skore
+    results = []
+    for key_length in key_lengths:
+        candidates = attack_transposition(
+            ciphertext, matrix_str, cipher_type, key_length, **kwargs
+        )
+        if candidates:
+            results.append(candidates[0])
+    results.sort(key=lambda candidate: candidate.score, reverse=True)
+    return results
@@ -0,0 +1,180 @@
+import array
+import math
+from typing import Dict, Iterable, List, Mapping
+
+from adfgvx_cipher import (
+    ALPHABET_CZECH_25,
+    ALPHABET_ENGLISH_25,
+    SPACE_MARKER,
+    normalize_by_language,
+    remove_diacritics,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NGRAM = 4
+LANGUAGE_ALPHABETS = {
+    "czech": ALPHABET_CZECH_25,
+    "english": ALPHABET_ENGLISH_25,
+}
+
+
+def _normalize(text: str, alphabet: str) -> str:
+    return normalize_by_language(remove_diacritics(text).upper(), alphabet)
+
+
+class QuadgramScorer:
+    # Log pravdepodobnosti vsetkych quadgramov v jednom plochom poli,
+    # index quadgramu abcd je ((a*R + b)*R + c)*R + d, R = dlzka abecedy
+    def __init__(self, alphabet: str, counts: Mapping[str, int]):
+        self.alphabet = alphabet
+        self.radix = len(alphabet)
+        self.codes = {char: code for code, char in enumerate(alphabet)}
+        # Znaky mimo abecedy (medzery, cislice, ...) sa pri kodovani zmazu
+        self._translate = {ord(char): chr(code) for char, code in self.codes.items()}
+        self._array = None
+
+        total = sum(counts.values())
+        if total <= 0:
+            raise ValueError("Quadgram statistics are empty")
+
+        self.floor = math.log10(0.01 / total)
+        self.table = array.array("d", [self.floor]) * self.radix**NGRAM
+        for quadgram, count in counts.items():
+            index = self.index(self.encode(quadgram))
+            self.table[index] = math.log10(count / total)
+
+    def index(self, codes) -> int:
+        index = 0
+        for code in codes:
+            index = index * self.radix + code
+        return index
+
+    def encode(self, text: str) -> bytearray:
+        text = _normalize(text, self.alphabet)
+        kept = "".join(c for c in text if c in self.codes)
+        return bytearray(kept.translate(self._translate), "latin-1")
+
+    def _indices(self, codes) -> List[int]:
+        radix = self.radix
+        return [
+            ((a * radix + b) * radix + c) * radix + d
+            for a, b, c, d in zip(codes, codes[1:], codes[2:], codes[3:])
+        ]
+
+    def score_codes(self, codes) -> float:
+        return sum(map(self.table.__getitem__, self._indices(codes)), 0.0)
+
+    def score(self, text: str) -> float:
+        return self.score_codes(self.encode(text))
+
+    def _windows(self, length: int, positions: Iterable[int]) -> List[int]:
+        starts = set()
+        for pos in positions:
+            first = max(0, pos - NGRAM + 1)
+            starts.update(range(first, min(pos, length - NGRAM) + 1))
+        return sorted(starts)
+
+    def _window_sum(self, codes, starts: List[int]) -> float:
+        table = self.table
+        radix = self.radix
+        return sum(
+            table[
+                ((codes[i] * radix + codes[i + 1]) * radix + codes[i + 2]) * radix
+                + codes[i + 3]
+            ]
+            for i in starts
+        )
+
+    # Zmena skore, ak by sa na poziciach z changes zmenili kody; prepocitaju
+    # sa len quadgramy, ktore tieto pozicie obsahuju
+    def delta(self, codes: bytearray, changes: Mapping[int, int]) -> float:
+        starts = self._windows(len(codes), changes)
+        before = self._window_sum(codes, starts)
+
+        previous = {pos: codes[pos] for pos in changes}
+        for pos, code in changes.items():
+            codes[pos] = code
+        after = self._window_sum(codes, starts)
+        for pos, code in previous.items():
+            codes[pos] = code
+
+        return after - before
+
+    def rescore(
+        self, codes: bytearray, score: float, changes: Mapping[int, int]
+    ) -> float:
+        score += self.delta(codes, changes)
+        for pos, code in changes.items():
+            codes[pos] = code
+        return score
+
+    def score_batch(self, texts: Iterable[str]) -> List[float]:
+        encoded = [self.encode(text) for text in texts]
+        if np is None:
+            return [self.score_codes(codes) for codes in encoded]
+
+        if self._array is None:
+            self._array = np.frombuffer(self.table, dtype=np.float64)
+
+        # Vsetky texty za sebou, sucty quadgramov cez kumulativny sucet
+        lengths = np.array([len(codes) for codes in encoded], dtype=np.intp)
+        joined = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.intp)
+        if len(joined) < NGRAM:
+            return [0.0] * len(encoded)
+
+        radix = self.radix
+        indices = joined[:-3] * radix**3 + joined[1:-2] * radix**2
+        indices += joined[2:-1] * radix + joined[3:]
+        cumulative = np.concatenate(([0.0], np.cumsum(self._array[indices])))
+
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        counts = np.maximum(lengths - NGRAM + 1, 0)
+        return (cumulative[starts + counts] - cumulative[starts]).tolist()
+
+
+# space_marker=True pocita medzery ako SPACE_MARKER, tak ako vyzera
+# desifrovany text pred nahradou markerov
+def count_quadgrams(
+    text: str, alphabet: str, space_marker: bool = False
+) -> Dict[str, int]:
+    text = _normalize(text, alphabet)
+    if space_marker:
+        text = " ".join(text.split()).replace(" ", SPACE_MARKER)
+    letters = "".join(c for c in text if c in alphabet)
+    counts = {}
+    for i in range(len(letters) - NGRAM + 1):
+        quadgram = letters[i : i + NGRAM]
+        counts[quadgram] = counts.get(quadgram, 0) + 1
+    return counts
+
+
+def from_corpus(
+    text: str, alphabet: str, space_marker: bool = False
+) -> QuadgramScorer:
+    return QuadgramScorer(alphabet, count_quadgrams(text, alphabet, space_marker))
+
+
+# Subor v tvare "TION 13168375" na riadok; W/J a diakritika sa zlozia podla
+# abecedy, takze sa da pouzit aj anglicka tabulka s 26 pismenami
+def load_quadgrams(path: str, alphabet: str) -> QuadgramScorer:
+    counts = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) != 2:
+                continue
+            quadgram = _normalize(parts[0], alphabet)
+            if len(quadgram) != NGRAM or any(c not in alphabet for c in quadgram):
+                continue
+            counts[quadgram] = counts.get(quadgram, 0) + int(parts[1])
+    return QuadgramScorer(alphabet, counts)
+
+
+def load_language(path: str, language: str) -> QuadgramScorer:
+    if language not in LANGUAGE_ALPHABETS:
+        raise ValueError(f"Unknown language: {language}")
+    return load_quadgrams(path, LANGUAGE_ALPHABETS[language])
@@ -0,0 +1,459 @@
+import argparse
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy_engine
+from adfgvx_cipher import (
+    CIPHER_VARIANTS,
+    DEFAULT_TOKENS,
+    DIGIT_TOKENS,
+    PUNCTUATION_TOKENS,
+    CompiledCipher,
+    compile_cipher,
+    create_matrix,
+    decrypt_stream,
+    encrypt_fanout,
+    filter_input,
+    format_five,
+    get_variant,
+    iter_encrypt_blocks,
+    substitute_decrypt,
+    substitute_encrypt,
+    transpose_decrypt,
+    transpose_encrypt,
+)
+from container import decrypt_packed, encrypt_packed, pack, unpack_text
+
+# Diferencialny fuzz: nahodne kluce, matice a texty idu cez referencne funkcie
+# (substitute_encrypt, transpose_encrypt, ...) aj cez kazdy rychlejsi engine.
+# Vysledky sa musia zhodovat do znaku, zaroven sa meria zrychlenie
+CIPHER_TYPES = list(CIPHER_VARIANTS)
+DEFAULT_CASES = 200
+DEFAULT_MAX_LENGTH = 2000
+DEFAULT_REPEAT = 1
+# Zrychlenie sa hodnoti len na dost dlhych textoch, kratke su len sum
+SPEED_MIN_LENGTH = 1000
+
+PIECES = [
+    "ahoj",
+    "svete",
+    "příliš",
+    "žluťoučký",
+    "kůň",
+    "Ďábelské ÓDY",
+    "the quick brown fox",
+    "Wizard JAZZ",
+    "2024",
+    "0123456789",
+    "3.14",
+    "Hello, world!",
+    "Co? Nie!",
+    "- : ; ' \" ( ) /",
+    "XMEZERAX",
+    "XNULAX",
+    "  ",
+    "\n",
+    "\t",
+    "ß",
+    "€",
+    "ﬁ",
+]
+# Zdroj keywordov; "AB" dava vela opakovanych pismen
+KEYWORD_POOLS = ["AB", "ABC", "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "KLIC0123456789kw"]
+TOKEN_SETS = {
+    "digits": {**DEFAULT_TOKENS, **DIGIT_TOKENS},
+    "punctuation": {**DEFAULT_TOKENS, **DIGIT_TOKENS, **PUNCTUATION_TOKENS},
+}
+
+
+class Case(NamedTuple):
+    index: int
+    cipher_type: str
+    matrix_str: str
+    keyword: str
+    text: str
+    # "default" = len XMEZERAX ako v referencii, "variant" = tokeny typu
+    # sifry, inak kluc z TOKEN_SETS
+    token_set: str
+    block_size: int
+    noisy: bool
+
+
+def case_tokens(case: Case) -> Optional[Dict[str, str]]:
+    if case.token_set == "default":
+        return DEFAULT_TOKENS
+    if case.token_set == "variant":
+        return None
+    return TOKEN_SETS[case.token_set]
+
+
+def generate_text(rng: random.Random, max_length: int) -> str:
+    roll = rng.random()
+    if roll < 0.2:
+        limit = rng.randint(0, 3)
+    elif roll < 0.7:
+        limit = rng.randint(4, 60)
+    else:
+        limit = rng.randint(61, max(61, max_length))
+
+    parts = []
+    length = 0
+    while length < limit:
+        if rng.random() < 0.3:
+            part = chr(rng.randint(32, 0x17F))
+        else:
+            part = rng.choice(PIECES)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)[:limit]
+
+
+def generate_case(seed: int, index: int, types: List[str], max_length: int) -> Case:
+    rng = random.Random(f"{seed}:{index}")
+    cipher_type = rng.choice(types)
+    variant = get_variant(cipher_type)
+    matrix_str = "".join(rng.sample(variant.alphabet, len(variant.alphabet)))
+
+    pool = rng.choice(KEYWORD_POOLS)
+    keyword = "".join(rng.choice(pool) for _ in range(rng.randint(1, 20)))
+
+    # Referencne funkcie poznaju len XMEZERAX, ostatne sady sa porovnavaju
+    # s CompiledCipher (ten je overeny referenciou pri "default")
+    token_set = rng.choice(["default", "default", "variant"] + list(TOKEN_SETS))
+    return Case(
+        index,
+        cipher_type,
+        matrix_str,
+        keyword,
+        generate_text(rng, max_length),
+        token_set,
+        2 * rng.randint(1, 64),
+        rng.random() < 0.3,
+    )
+
+
+def noisy(ciphertext: str, case: Case) -> str:
+    # Skupiny po piatich, male pismena a zalomenie, decrypt to musi vycistit
+    if not case.noisy:
+        return ciphertext
+    return format_five(ciphertext).lower().replace(" ", " \n", 3)
+
+
+def reference_encrypt(case: Case) -> str:
+    variant = get_variant(case.cipher_type)
+    matrix = create_matrix(case.matrix_str, variant.size)
+    filtered, _ = filter_input(case.text, variant.alphabet)
+    substituted = substitute_encrypt(filtered, matrix, variant.indices)
+    return transpose_encrypt(substituted, case.keyword.upper())[0]
+
+
+def reference_decrypt(ciphertext: str, case: Case) -> str:
+    variant = get_variant(case.cipher_type)
+    matrix = create_matrix(case.matrix_str, variant.size)
+    clean = "".join(c for c in ciphertext.upper() if c in variant.indices)
+    substituted = transpose_decrypt(clean, case.keyword.upper(), len(clean))
+    return substitute_decrypt(substituted, matrix, variant.indices)
+
+
+def _cipher(case: Case) -> CompiledCipher:
+    return compile_cipher(
+        case.cipher_type, case.matrix_str, case.keyword, case_tokens(case)
+    )
+
+
+# Kazdy engine vrati (ciphertext, plaintext z desifrovania ciphertext_in);
+# None = tento smer engine nema
+EngineResult = Tuple[Optional[str], Optional[str]]
+
+
+def run_compiled(case: Case, ciphertext_in: str, engine="python") -> EngineResult:
+    cipher = _cipher(case)
+    return (
+        cipher.encrypt_text(case.text, engine),
+        cipher.decrypt_text(ciphertext_in, engine),
+    )
+
+
+def run_bytes(case: Case, ciphertext_in: str, engine="python") -> EngineResult:
+    cipher = _cipher(case)
+    return (
+        cipher.encrypt_bytes(case.text.encode("utf-8"), engine=engine).decode("ascii"),
+        cipher.decrypt_bytes(ciphertext_in.encode("utf-8"), engine=engine).decode(
+            "utf-8"
+        ),
+    )
+
+
+def run_stream(case: Case, ciphertext_in: str, engine="python") -> EngineResult:
+    cipher = _cipher(case)
+    # Male kusy vstupu, aby sa markery a digrafy delili medzi kusy
+    rng = random.Random(case.index)
+    chunks = []
+    pos = 0
+    while pos < len(case.text):
+        step = rng.randint(1, 17)
+        chunks.append(case.text[pos : pos + step])
+        pos += step
+    blocks = list(iter_encrypt_blocks(chunks, cipher, case.block_size, engine))[1:]
+
+    # Bloky sa referencne vratia na substituovany text a zasifruju ako celok,
+    # takze vysledok je porovnatelny s jednou transpoziciou
+    keyword = cipher.keyword
+    substituted = "".join(
+        transpose_decrypt(block, keyword, len(block)) for block in blocks
+    )
+    ciphertext = transpose_encrypt(substituted, keyword)[0]
+
+    length = sum(c in cipher.indices for c in ciphertext_in.upper())
+    reader = io.StringIO(f"BLOCK {max(2, length + length % 2)}\n{ciphertext_in}")
+    writer = io.StringIO()
+    decrypt_stream(
+        reader,
+        writer,
+        cipher.matrix_str,
+        cipher.keyword,
+        cipher.cipher_type,
+        chunk_size=rng.randint(1, 64),
+        engine=engine,
+        tokens=case_tokens(case),
+    )
+    return ciphertext, writer.getvalue()
+
+
+def run_fanout(case: Case, ciphertext_in: str, engine="python") -> EngineResult:
+    variant = get_variant(case.cipher_type)
+    other = (variant.alphabet[::-1], "FANOUT")
+    ciphertexts = encrypt_fanout(
+        case.text,
+        [(case.matrix_str, case.keyword), other],
+        case.cipher_type,
+        engine,
+        case_tokens(case),
+    )
+    return ciphertexts[0], None
+
+
+def run_packed(case: Case, ciphertext_in: str, engine="python") -> EngineResult:
+    tokens = case_tokens(case)
+    blob = encrypt_packed(
+        case.text, case.matrix_str, case.keyword, case.cipher_type, 0, engine, tokens
+    )
+    return (
+        unpack_text(blob),
+        decrypt_packed(
+            pack(ciphertext_in, case.cipher_type),
+            case.matrix_str,
+            case.keyword,
+            engine,
+            tokens,
+        ),
+    )
+
+
+def _numpy(func: Callable) -> Callable:
+    return lambda case, ciphertext_in: func(case, ciphertext_in, "numpy")
+
+
+ENGINES: Dict[str, Callable[[Case, str], EngineResult]] = {
+    "compiled": run_compiled,
+    "numpy": _numpy(run_compiled),
+    "bytes": run_bytes,
+    "bytes-numpy": _numpy(run_bytes),
+    "stream": run_stream,
+    "stream-numpy": _numpy(run_stream),
+    "fanout": run_fanout,
+    "fanout-numpy": _numpy(run_fanout),
+    "packed": run_packed,
+}
+
+
+def measure(func: Callable[[], object], repeat: int) -> Tuple[object, float]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run_case(case: Case, engines: List[str], repeat: int) -> List[Dict]:
+    # Orakulum: referencne funkcie, alebo CompiledCipher pre ine tokeny
+    if case.token_set == "default":
+        oracle = "reference"
+
+        def expected_pair():
+            ciphertext = reference_encrypt(case)
+            return ciphertext, reference_decrypt(noisy(ciphertext, case), case)
+
+    else:
+        oracle = "compiled"
+
+        def expected_pair():
+            cipher = _cipher(case)
+            ciphertext = cipher.encrypt_text(case.text)
+            return ciphertext, cipher.decrypt_text(noisy(ciphertext, case))
+
+    (expected, expected_plain), oracle_seconds = measure(expected_pair, repeat)
+    ciphertext_in = noisy(expected, case)
+
+    results = []
+    for name in engines:
+        if oracle == "compiled" and name == "compiled":
+            continue
+        error = None
+        try:
+            (got, got_plain), seconds = measure(
+                lambda: ENGINES[name](case, ciphertext_in), repeat
+            )
+            ok = got == expected and got_plain in (None, expected_plain)
+        except Exception as e:
+            got = got_plain = None
+            seconds = float("nan")
+            ok = False
+            error = f"{type(e).__name__}: {e}"
+
+        result = {
+            "case": case.index,
+            "engine": name,
+            "oracle": oracle,
+            "cipher_type": case.cipher_type,
+            "tokens": case.token_set,
+            "key_length": len(case.keyword),
+            "length": len(case.text),
+            "ok": ok,
+            "oracle_seconds": oracle_seconds,
+            "seconds": seconds,
+            "speedup": oracle_seconds / seconds if seconds > 0 else None,
+        }
+        if not ok:
+            # Vsetko potrebne na zopakovanie chyby
+            result["input"] = case._asdict()
+            result["expected"] = [expected, expected_plain]
+            result["got"] = [got, got_plain]
+            result["error"] = error
+        results.append(result)
+    return results
+
+
+def summarize(results: List[Dict], speed_min_length: int) -> Dict[str, Dict]:
+    summary = {}
+    for name in dict.fromkeys(result["engine"] for result in results):
+        rows = [result for result in results if result["engine"] == name]
+        speedups = [
+            result["speedup"]
+            for result in rows
+            if result["ok"]
+            and result["oracle"] == "reference"
+            and result["length"] >= speed_min_length
+            and result["speedup"] is not None
+        ]
+        summary[name] = {
+            "cases": len(rows),
+            "mismatches": sum(not result["ok"] for result in rows),
+            "speed_cases": len(speedups),
+            "median_speedup": statistics.median(speedups) if speedups else None,
+            "min_speedup": min(speedups) if speedups else None,
+        }
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare every cipher engine against the reference functions."
+    )
+    parser.add_argument("--cases", type=int, default=DEFAULT_CASES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--case", type=int, help="run only this case index")
+    parser.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH)
+    parser.add_argument(
+        "--types", nargs="+", choices=CIPHER_TYPES, default=CIPHER_TYPES
+    )
+    parser.add_argument(
+        "--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES)
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("-o", "--output", help="write JSON results to this file")
+    parser.add_argument(
+        "--min-speedup",
+        type=float,
+        help="fail if an engine's median speedup over the reference is lower",
+    )
+    parser.add_argument(
+        "--speed-min-length",
+        type=int,
+        default=SPEED_MIN_LENGTH,
+        help="only texts at least this long count towards the speedup",
+    )
+    args = parser.parse_args(argv)
+
+    engines = args.engines
+    skipped = []
+    if not numpy_engine.available():
+        skipped = [name for name in engines if name.endswith("numpy")]
+        engines = [name for name in engines if name not in skipped]
+
+    indices = [args.case] if args.case is not None else range(args.cases)
+    results = []
+    for index in indices:
+        case = generate_case(args.seed, index, args.types, args.max_length)
+        for result in run_case(case, engines, args.repeat):
+            results.append(result)
+            if not result["ok"]:
+                print(
+                    f"MISMATCH case={index} engine={result['engine']} "
+                    f"type={case.cipher_type} tokens={case.token_set} "
+                    f"{result['error'] or ''}",
+                    file=sys.stderr,
+                )
+
+    summary = summarize(results, args.speed_min_length)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "cases": len(indices),
+        "repeat": args.repeat,
+        "skipped_engines": skipped,
+        "summary": summary,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    for name, row in summary.items():
+        median = row["median_speedup"]
+        print(
+            f"{name:14} cases={row['cases']:<5} mismatches={row['mismatches']:<4} "
+            f"median speedup="
+            + ("-" if median is None else f"{median:.2f}x"),
+            file=sys.stderr,
+        )
+
+    failed = any(row["mismatches"] for row in summary.values())
+    if args.min_speedup is not None:
+        for name, row in summary.items():
+            median = row["median_speedup"]
+            if median is not None and median < args.min_speedup:
+                print(
+                    f"SLOW {name}: median speedup {median:.2f}x "
+                    f"< {args.min_speedup:.2f}x",
+                    file=sys.stderr,
+                )
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
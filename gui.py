@@ -1,5 +1,8 @@
+import bisect
+import queue
+import threading
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import filedialog, messagebox, ttk
 
 # Oprava DPI scalingu na Windows
 try:
@@ -15,16 +18,15 @@ except:
         pass
 
 from adfgvx_cipher import (
+    PhaseStats,
+    compile_cipher,
     encrypt,
     decrypt,
-    format_five,
     generate_random_alphabet,
     remove_diacritics,
-    ALPHABET_CZECH_25,
-    ALPHABET_ENGLISH_25,
-    ALPHABET_36,
-    ADFGX_INDICES,
-    ADFGVX_INDICES,
+    write_five,
+    CIPHER_VARIANTS,
+    get_variant,
 )
 
 DARK_BG = "#222026"
@@ -37,21 +39,239 @@ FONT = ("Consolas", 11)
 LABEL_FONT = ("Consolas", 12, "bold")
 BUTTON_FONT = ("Consolas", 12, "bold")
 
+# Popisky typov sifry; typ bez popisku sa zobrazi pod svojim menom
+CIPHER_LABELS = {
+    "ADFGX_CZECH": "ADFGX (CZ)",
+    "ADFGX_ENGLISH": "ADFGX (EN)",
+    "ADFGVX": "ADFGVX",
+    "ADFGVXZ": "ADFGVXZ 7x7",
+    "ADFGKVXZ_CZECH": "8x8 (CZ)",
+}
+CIPHERS_PER_ROW = 3
+MATRIX_MAX = max(variant.size for variant in CIPHER_VARIANTS.values())
+
+# Ako casto hlavne vlakno pozera na vysledky workera (ms)
+POLL_MS = 50
+# Filter, substitucia, transpozicia
+PHASE_COUNT = 3
+
+
+# Nahlad sa prepocita az ked sa chvilu nepise (ms)
+PREVIEW_DELAY_MS = 300
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class LivePreview:
+    # Filter aj substitucia idu znak po znaku, takze text sa da spracovat po
+    # riadkoch; pri zmene sa prepocitaju len riadky medzi spolocnym
+    # zaciatkom a koncom, transpozicia sa spravi znova z celeho textu
+    def __init__(self):
+        self.key = None
+        self.cipher = None
+        self.lines = []
+        self.filtered = []
+        self.substituted = []
+
+    def update(self, text, matrix_str, keyword, cipher_type):
+        key = (cipher_type, matrix_str, keyword.upper())
+        if key != self.key:
+            self.cipher = compile_cipher(cipher_type, matrix_str, keyword)
+            self.key = key
+            self.lines, self.filtered, self.substituted = [], [], []
+
+        lines = text.splitlines(keepends=True)
+        limit = min(len(lines), len(self.lines))
+        prefix = 0
+        while prefix < limit and lines[prefix] == self.lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while (
+            suffix < limit - prefix
+            and lines[-1 - suffix] == self.lines[-1 - suffix]
+        ):
+            suffix += 1
+
+        old_end = len(self.lines) - suffix
+        changed = lines[prefix : len(lines) - suffix]
+        filtered = [self.cipher.filter_text(line) for line in changed]
+        self.filtered[prefix:old_end] = filtered
+        self.substituted[prefix:old_end] = map(self.cipher.substitute, filtered)
+        self.lines = lines
+
+        filtered_text = "".join(self.filtered)
+        substituted = "".join(self.substituted)
+        return (
+            filtered_text.replace(" ", ""),
+            substituted,
+            "\n".join(self.cipher.column_display(substituted)),
+            self.cipher.transpose(substituted),
+        )
+
+
+class TextLines:
+    # Text zalomeny na riadky sirky width; pamata si len hranice odstavcov,
+    # konkretny riadok sa vyreze az pri zobrazeni
+    def __init__(self, text, width):
+        self.text = text
+        self.width = width
+        self.paragraphs = []
+        self.first_lines = []
+
+        count = 0
+        start = 0
+        while True:
+            end = text.find("\n", start)
+            if end < 0:
+                end = len(text)
+            self.paragraphs.append((start, end))
+            self.first_lines.append(count)
+            count += max(1, -(-(end - start) // width))
+            if end == len(text):
+                break
+            start = end + 1
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def line(self, index):
+        paragraph = bisect.bisect_right(self.first_lines, index) - 1
+        start, end = self.paragraphs[paragraph]
+        offset = start + (index - self.first_lines[paragraph]) * self.width
+        return self.text[offset : min(offset + self.width, end)]
+
+    def save(self, fp):
+        fp.write(self.text)
+
+
+class GroupedLines:
+    # Ako format_five, ale skupiny sa skladaju len pre zobrazene riadky
+    def __init__(self, text, group_size=5, groups_per_line=5):
+        self.text = text.replace(" ", "")
+        self.group_size = group_size
+        self.line_size = group_size * groups_per_line
+
+    def __len__(self):
+        return -(-len(self.text) // self.line_size)
+
+    def line(self, index):
+        chunk = self.text[index * self.line_size : (index + 1) * self.line_size]
+        size = self.group_size
+        return " ".join(chunk[i : i + size] for i in range(0, len(chunk), size))
+
+    def save(self, fp):
+        write_five(self.text, fp, self.group_size)
+
+
+class VirtualText:
+    # Tk Text dostane len viditelne riadky, cely text ostava v Pythone,
+    # takze aj megabajtovy vysledok sa zobrazi a posuva okamzite
+    def __init__(self, parent, height, width, font):
+        self.height = height
+        self.width = width
+        self.lines = TextLines("", width)
+        self.top = 0
+
+        self.frame = tk.Frame(parent, bg=DARK_BG)
+        self.widget = tk.Text(
+            self.frame,
+            height=height,
+            width=width,
+            bg=DARK_ENTRY,
+            fg=LIGHT_TXT,
+            state=tk.DISABLED,
+            font=font,
+            wrap=tk.NONE,
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=LIGHT_TXT,
+            highlightcolor=LIGHT_TXT,
+        )
+        self.scrollbar = tk.Scrollbar(
+            self.frame,
+            orient=tk.VERTICAL,
+            command=self.on_scroll,
+            bg=BUTTON_BG,
+            troughcolor=DARK_BG,
+            activebackground=HIGHLIGHT_BG,
+        )
+        self.widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.widget.bind(sequence, self.on_wheel)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_text(self, text):
+        self.set_lines(TextLines(text, self.width))
+
+    def set_lines(self, lines):
+        self.lines = lines
+        self.top = 0
+        self.render()
+
+    def render(self):
+        end = min(len(self.lines), self.top + self.height)
+        visible = "\n".join(self.lines.line(i) for i in range(self.top, end))
+
+        self.widget.config(state=tk.NORMAL)
+        self.widget.delete(1.0, tk.END)
+        self.widget.insert(1.0, visible)
+        self.widget.config(state=tk.DISABLED)
+
+        total = max(len(self.lines), 1)
+        self.scrollbar.set(self.top / total, max(end, 1) / total)
+
+    def scroll_to(self, top):
+        top = max(0, min(top, len(self.lines) - self.height))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == tk.MOVETO:
+            self.scroll_to(int(float(amount) * len(self.lines)))
+        elif action == tk.SCROLL:
+            step = self.height if unit == tk.PAGES else 1
+            self.scroll_to(self.top + int(amount) * step)
+
+    def on_wheel(self, event):
+        # Windows/macOS posielaju delta, Linux Button-4/5
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top - 1)
+        else:
+            self.scroll_to(self.top + 1)
+        return "break"
+
 
 class AdfgvxCipherGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("ADFGVX Cipher")
-        self.root.geometry("750x620")
+        self.root.geometry("750x650")
         self.root.resizable(False, False)
         self.root.configure(bg=DARK_BG)
 
         self.cipher_var = tk.StringVar(value="ADFGX_CZECH")
-        self.current_alphabet = ALPHABET_CZECH_25
-        self.current_indices = ADFGX_INDICES
-        self.matrix_size = 5
+        variant = get_variant(self.cipher_var.get())
+        self.current_alphabet = variant.alphabet
+        self.current_indices = variant.indices
+        self.matrix_size = variant.size
         self.current_matrix_str = ""
 
+        # Bezaca uloha (jej fronta) a udalost na zrusenie
+        self.job = None
+        self.cancel_event = None
+
+        self.preview_var = tk.BooleanVar(value=False)
+        self.preview = LivePreview()
+        self.preview_after = None
+
         self.setup_ui()
         self.generate_new_matrix()
 
@@ -85,6 +305,7 @@ class AdfgvxCipherGUI:
             highlightcolor=LIGHT_TXT,
         )
         self.input_text.pack(fill=tk.BOTH, expand=False, padx=(3, 0), pady=(0, 10))
+        self.input_text.bind("<<Modified>>", self.on_input_modified)
 
         tk.Label(
             left_frame,
@@ -116,20 +337,7 @@ class AdfgvxCipherGUI:
             fg=LIGHT_TXT,
             font=LABEL_FONT,
         ).pack(anchor=tk.W, pady=(0, 5))
-        self.substituted_text = tk.Text(
-            left_frame,
-            height=3,
-            width=35,
-            bg=DARK_ENTRY,
-            fg=LIGHT_TXT,
-            state=tk.DISABLED,
-            font=FONT,
-            wrap=tk.WORD,
-            relief=tk.FLAT,
-            highlightthickness=1,
-            highlightbackground=LIGHT_TXT,
-            highlightcolor=LIGHT_TXT,
-        )
+        self.substituted_text = VirtualText(left_frame, height=3, width=35, font=FONT)
         self.substituted_text.pack(
             fill=tk.BOTH, expand=False, padx=(3, 0), pady=(0, 10)
         )
@@ -141,43 +349,32 @@ class AdfgvxCipherGUI:
             fg=LIGHT_TXT,
             font=LABEL_FONT,
         ).pack(anchor=tk.W, pady=(0, 5))
-        self.columns_text = tk.Text(
-            left_frame,
-            height=5,
-            width=35,
-            bg=DARK_ENTRY,
-            fg=LIGHT_TXT,
-            state=tk.DISABLED,
-            font=("Consolas", 9),
-            wrap=tk.WORD,
-            relief=tk.FLAT,
-            highlightthickness=1,
-            highlightbackground=LIGHT_TXT,
-            highlightcolor=LIGHT_TXT,
+        self.columns_text = VirtualText(
+            left_frame, height=5, width=35, font=("Consolas", 9)
         )
         self.columns_text.pack(fill=tk.BOTH, expand=False, padx=(3, 0), pady=(0, 10))
 
+        output_header = tk.Frame(left_frame, bg=DARK_BG)
+        output_header.pack(fill=tk.X, pady=(0, 5))
         tk.Label(
-            left_frame,
+            output_header,
             text="OUTPUT",
             bg=DARK_BG,
             fg=LIGHT_TXT,
             font=LABEL_FONT,
-        ).pack(anchor=tk.W, pady=(0, 5))
-        self.output_text = tk.Text(
-            left_frame,
-            height=3,
-            width=35,
-            bg=DARK_ENTRY,
-            fg=LIGHT_TXT,
-            state=tk.DISABLED,
-            font=FONT,
-            wrap=tk.WORD,
-            relief=tk.FLAT,
-            highlightthickness=1,
-            highlightbackground=LIGHT_TXT,
-            highlightcolor=LIGHT_TXT,
+        ).pack(side=tk.LEFT)
+
+        # Cely vysledok ide rovno do suboru, nie cez Text widget
+        self.save_btn = ttk.Button(
+            output_header,
+            text="SAVE",
+            style="Custom.TButton",
+            command=self.save_output,
+            cursor="hand2",
+            width=6,
         )
+        self.save_btn.pack(side=tk.RIGHT)
+        self.output_text = VirtualText(left_frame, height=3, width=35, font=FONT)
         self.output_text.pack(fill=tk.BOTH, expand=False, padx=(3, 0), pady=(0, 10))
 
         self.setup_buttons(left_frame)
@@ -219,7 +416,31 @@ class AdfgvxCipherGUI:
             command=self.do_decrypt,
             cursor="hand2",
         )
-        self.decrypt_btn.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        self.decrypt_btn.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 5))
+
+        self.cancel_btn = ttk.Button(
+            button_frame,
+            text="CANCEL",
+            style="Custom.TButton",
+            command=self.cancel_job,
+            cursor="hand2",
+        )
+        self.cancel_btn.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        self.cancel_btn.state(["disabled"])
+
+        style.configure(
+            "Custom.Horizontal.TProgressbar",
+            troughcolor=BUTTON_BG,
+            background=HIGHLIGHT_BG,
+            borderwidth=0,
+        )
+        self.progress = ttk.Progressbar(
+            parent,
+            style="Custom.Horizontal.TProgressbar",
+            mode="determinate",
+            maximum=PHASE_COUNT,
+        )
+        self.progress.pack(fill=tk.X, padx=(5, 0))
 
     def setup_right_panel(self, parent):
         right_frame = tk.Frame(parent, bg=DARK_BG, width=450)
@@ -271,52 +492,43 @@ class AdfgvxCipherGUI:
         # Zobrazenie matice
         self.setup_matrix(right_frame)
 
-    # Radio buttons
-    def setup_cipher_selection(self, parent):
-        radio_frame = tk.Frame(parent, bg=DARK_BG)
-        radio_frame.pack(anchor=tk.W, pady=(5, 5))
-
-        tk.Radiobutton(
-            radio_frame,
-            text="ADFGX (CZ)",
-            variable=self.cipher_var,
-            value="ADFGX_CZECH",
+        tk.Checkbutton(
+            right_frame,
+            text="Live preview",
+            variable=self.preview_var,
             bg=DARK_BG,
             fg=LIGHT_TXT,
             selectcolor=BUTTON_BG,
             font=("Consolas", 10),
-            command=self.change_cipher_type,
+            command=self.schedule_preview,
             activebackground=DARK_BG,
             activeforeground=LIGHT_TXT,
-        ).pack(side=tk.LEFT, padx=(0, 15))
+        ).pack(anchor=tk.W)
 
-        tk.Radiobutton(
-            radio_frame,
-            text="ADFGX (EN)",
-            variable=self.cipher_var,
-            value="ADFGX_ENGLISH",
-            bg=DARK_BG,
-            fg=LIGHT_TXT,
-            selectcolor=BUTTON_BG,
-            font=("Consolas", 10),
-            command=self.change_cipher_type,
-            activebackground=DARK_BG,
-            activeforeground=LIGHT_TXT,
-        ).pack(side=tk.LEFT, padx=(15, 15))
+    # Radio buttons
+    def setup_cipher_selection(self, parent):
+        radio_frame = tk.Frame(parent, bg=DARK_BG)
+        radio_frame.pack(anchor=tk.W, pady=(5, 5))
 
-        tk.Radiobutton(
-            radio_frame,
-            text="ADFGVX",
-            variable=self.cipher_var,
-            value="ADFGVX",
-            bg=DARK_BG,
-            fg=LIGHT_TXT,
-            selectcolor=BUTTON_BG,
-            font=("Consolas", 10),
-            command=self.change_cipher_type,
-            activebackground=DARK_BG,
-            activeforeground=LIGHT_TXT,
-        ).pack(side=tk.LEFT, padx=(15, 0))
+        for position, name in enumerate(CIPHER_VARIANTS):
+            tk.Radiobutton(
+                radio_frame,
+                text=CIPHER_LABELS.get(name, name),
+                variable=self.cipher_var,
+                value=name,
+                bg=DARK_BG,
+                fg=LIGHT_TXT,
+                selectcolor=BUTTON_BG,
+                font=("Consolas", 10),
+                command=self.change_cipher_type,
+                activebackground=DARK_BG,
+                activeforeground=LIGHT_TXT,
+            ).grid(
+                row=position // CIPHERS_PER_ROW,
+                column=position % CIPHERS_PER_ROW,
+                sticky=tk.W,
+                padx=(0, 15),
+            )
 
     def setup_keyword_entry(self, parent):
         tk.Label(
@@ -373,7 +585,7 @@ class AdfgvxCipherGUI:
         ).grid(row=0, column=0)
 
         self.col_headers = []
-        for j in range(6):
+        for j in range(MATRIX_MAX):
             lbl = tk.Label(
                 matrix_container,
                 text="",
@@ -388,7 +600,7 @@ class AdfgvxCipherGUI:
         self.matrix_labels = []
         self.row_headers = []
 
-        for i in range(6):
+        for i in range(MATRIX_MAX):
             row_lbl = tk.Label(
                 matrix_container,
                 text="",
@@ -401,7 +613,7 @@ class AdfgvxCipherGUI:
             self.row_headers.append(row_lbl)
 
             row = []
-            for j in range(6):
+            for j in range(MATRIX_MAX):
                 label = tk.Label(
                     matrix_container,
                     text="?",
@@ -419,20 +631,10 @@ class AdfgvxCipherGUI:
         self.update_matrix_size()
 
     def change_cipher_type(self):
-        choice = self.cipher_var.get()
-
-        if choice == "ADFGX_CZECH":
-            self.current_alphabet = ALPHABET_CZECH_25
-            self.current_indices = ADFGX_INDICES
-            self.matrix_size = 5
-        elif choice == "ADFGX_ENGLISH":
-            self.current_alphabet = ALPHABET_ENGLISH_25
-            self.current_indices = ADFGX_INDICES
-            self.matrix_size = 5
-        elif choice == "ADFGVX":
-            self.current_alphabet = ALPHABET_36
-            self.current_indices = ADFGVX_INDICES
-            self.matrix_size = 6
+        variant = get_variant(self.cipher_var.get())
+        self.current_alphabet = variant.alphabet
+        self.current_indices = variant.indices
+        self.matrix_size = variant.size
 
         self.update_matrix_size()
         self.generate_new_matrix()
@@ -442,12 +644,14 @@ class AdfgvxCipherGUI:
         self.matrix_entry.delete(0, tk.END)
         self.matrix_entry.insert(0, self.current_matrix_str)
         self.update_matrix_display()
+        self.schedule_preview()
 
     def on_matrix_input_change(self, event=None):
         self.current_matrix_str = self.matrix_entry.get().upper()
         self.matrix_entry.delete(0, tk.END)
         self.matrix_entry.insert(0, self.current_matrix_str)
         self.update_matrix_display()
+        self.schedule_preview()
 
     def on_keyword_change(self, event=None):
         keyword = self.keyword_entry.get().upper()
@@ -470,24 +674,29 @@ class AdfgvxCipherGUI:
         self.filtered_keyword_entry.delete(0, tk.END)
         self.filtered_keyword_entry.insert(0, filtered_keyword)
         self.filtered_keyword_entry.config(state="readonly")
+        self.schedule_preview()
 
     def update_matrix_size(self):
-        for j in range(6):
+        # Vacsie matice sa musia zmestit do rovnakeho panelu
+        cell_font = ("Consolas", 14 if self.matrix_size <= 6 else 10, "bold")
+
+        for j in range(MATRIX_MAX):
             if j < self.matrix_size:
                 self.col_headers[j].config(text=self.current_indices[j])
                 self.col_headers[j].grid()
             else:
                 self.col_headers[j].grid_remove()
 
-        for i in range(6):
+        for i in range(MATRIX_MAX):
             if i < self.matrix_size:
                 self.row_headers[i].config(text=self.current_indices[i])
                 self.row_headers[i].grid()
             else:
                 self.row_headers[i].grid_remove()
 
-            for j in range(6):
+            for j in range(MATRIX_MAX):
                 if i < self.matrix_size and j < self.matrix_size:
+                    self.matrix_labels[i][j].config(font=cell_font)
                     self.matrix_labels[i][j].grid()
                 else:
                     self.matrix_labels[i][j].grid_remove()
@@ -499,81 +708,212 @@ class AdfgvxCipherGUI:
             for j in range(self.matrix_size):
                 idx = i * self.matrix_size + j
                 if idx < len(matrix_str):
-                    self.matrix_labels[i][j].config(text=matrix_str[idx])
+                    # Medzera by v policku nebola vidiet
+                    char = "␣" if matrix_str[idx] == " " else matrix_str[idx]
+                    self.matrix_labels[i][j].config(text=char)
                 else:
                     self.matrix_labels[i][j].config(text="?")
 
+    # Ak je medzera v abecede, patri do matice a nesmie sa orezat
+    def read_matrix(self):
+        matrix_str = self.matrix_entry.get().upper()
+        if " " not in self.current_alphabet:
+            matrix_str = matrix_str.strip()
+        return matrix_str
+
     def set_text(self, widget, text):
         widget.config(state=tk.NORMAL)
         widget.delete(1.0, tk.END)
         widget.insert(1.0, text)
         widget.config(state=tk.DISABLED)
 
-    def do_encrypt(self):
+    def on_input_modified(self, event=None):
+        # Priznak sa musi zhodit, inak by <<Modified>> prisiel len raz
+        self.input_text.edit_modified(False)
+        self.schedule_preview()
+
+    def schedule_preview(self):
+        if self.preview_after is not None:
+            self.root.after_cancel(self.preview_after)
+            self.preview_after = None
+        if self.preview_var.get():
+            self.preview_after = self.root.after(
+                PREVIEW_DELAY_MS, self.update_preview
+            )
+
+    def update_preview(self):
+        self.preview_after = None
+        # Pocas sifrovania vo workeri by nahlad prepisal jeho vysledok
+        if self.job is not None or not self.preview_var.get():
+            return
+
+        plaintext = self.input_text.get(1.0, tk.END).strip()
+        keyword = self.keyword_entry.get().strip()
+        matrix_str = self.read_matrix()
+        if not keyword or len(matrix_str) != self.matrix_size * self.matrix_size:
+            return
+
         try:
-            plaintext = self.input_text.get(1.0, tk.END).strip()
-            keyword = self.keyword_entry.get().strip()
-            matrix_str = self.matrix_entry.get().strip().upper()
-
-            if not keyword:
-                messagebox.showwarning("Error", "Please enter a keyword!")
-                return
-
-            expected_len = self.matrix_size * self.matrix_size
-            if len(matrix_str) != expected_len:
-                messagebox.showwarning(
-                    "Error", f"Matrix must have exactly {expected_len} characters!"
-                )
-                return
+            result = self.preview.update(
+                plaintext, matrix_str, keyword, self.cipher_var.get()
+            )
+        except ValueError:
+            # Neplatny kluc pocas pisania, chybu ukaze az ENCRYPT
+            return
+        self.show_encrypted(result)
+
+    # Praca bezi vo vlakne, Tk sa dotyka len hlavne vlakno cez poll_job
+    def run_job(self, title, work, on_done):
+        jobs = queue.Queue()
+        cancel_event = threading.Event()
+
+        # Volane po kazdej faze sifry, zrusenie sa prejavi na hranici faz
+        def on_phase(record):
+            jobs.put(("progress", record["phase"]))
+            if cancel_event.is_set():
+                raise JobCancelled()
+
+        def worker():
+            try:
+                result = work(PhaseStats(on_phase))
+            except JobCancelled:
+                jobs.put(("cancelled", None))
+            except Exception as e:
+                jobs.put(("error", e))
+            else:
+                jobs.put(("done", result))
+
+        self.job = jobs
+        self.cancel_event = cancel_event
+        self.set_busy(True)
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(POLL_MS, self.poll_job, jobs, title, on_done)
+
+    def poll_job(self, jobs, title, on_done):
+        # Zrusena uloha, jej vysledok uz nikoho nezaujima
+        if jobs is not self.job:
+            return
+
+        while True:
+            try:
+                kind, value = jobs.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                # step() by na maxime pretiekol spat na nulu
+                self.progress["value"] = min(PHASE_COUNT, self.progress["value"] + 1)
+                continue
+
+            self.finish_job()
+            if kind == "done":
+                on_done(value)
+            elif kind == "error":
+                messagebox.showerror(title, str(value))
+            return
+
+        self.root.after(POLL_MS, self.poll_job, jobs, title, on_done)
+
+    def cancel_job(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.finish_job()
+        self.progress["value"] = 0
+
+    def finish_job(self):
+        self.job = None
+        self.cancel_event = None
+        self.set_busy(False)
+
+    def set_busy(self, busy):
+        state = ["disabled"] if busy else ["!disabled"]
+        self.encrypt_btn.state(state)
+        self.decrypt_btn.state(state)
+        self.cancel_btn.state(["!disabled"] if busy else ["disabled"])
+        self.root.config(cursor="watch" if busy else "")
+        if busy:
+            self.progress["value"] = 0
+
+    # Nacita a skontroluje vstupy, pri chybe vrati None
+    def read_job_inputs(self):
+        text = self.input_text.get(1.0, tk.END).strip()
+        keyword = self.keyword_entry.get().strip()
+        matrix_str = self.read_matrix()
+
+        if not keyword:
+            messagebox.showwarning("Error", "Please enter a keyword!")
+            return None
+
+        expected_len = self.matrix_size * self.matrix_size
+        if len(matrix_str) != expected_len:
+            messagebox.showwarning(
+                "Error", f"Matrix must have exactly {expected_len} characters!"
+            )
+            return None
+
+        return text, keyword, matrix_str, self.cipher_var.get()
 
-            cipher_type = self.cipher_var.get()
+    def do_encrypt(self):
+        inputs = self.read_job_inputs()
+        if inputs is None:
+            return
+        plaintext, keyword, matrix_str, cipher_type = inputs
 
+        # Bezi vo workeri, vracia uz hotove texty pre jednotlive polia
+        def work(stats):
             ciphertext, filtered, substituted, matrix, column_display = encrypt(
-                plaintext, matrix_str, keyword, cipher_type
+                plaintext, matrix_str, keyword, cipher_type, collector=stats
             )
 
-            filtered_display = filtered.replace(" ", "")
-            self.set_text(self.filtered_text, filtered_display)
-
-            self.set_text(self.substituted_text, format_five(substituted))
+            # Na skupiny po piatich sa text rozdeli az pri zobrazeni
+            return (
+                filtered.replace(" ", ""),
+                substituted,
+                "\n".join(column_display),
+                ciphertext,
+            )
 
-            # Zobraz vsetky stlpce
-            self.set_text(self.columns_text, "\n".join(column_display))
+        self.run_job("Encryption Error", work, self.show_encrypted)
 
-            # Odstran medzery z output
-            ciphertext_clean = ciphertext.replace(" ", "")
-            self.set_text(self.output_text, format_five(ciphertext_clean))
+    def show_encrypted(self, result):
+        filtered_display, substituted, columns, ciphertext = result
+        self.set_text(self.filtered_text, filtered_display)
+        self.substituted_text.set_lines(GroupedLines(substituted))
 
-        except Exception as e:
-            messagebox.showerror("Encryption Error", str(e))
+        # Zobraz vsetky stlpce
+        self.columns_text.set_text(columns)
+        self.output_text.set_lines(GroupedLines(ciphertext))
 
     def do_decrypt(self):
-        try:
-            ciphertext = self.input_text.get(1.0, tk.END).strip()
-            keyword = self.keyword_entry.get().strip()
-            matrix_str = self.matrix_entry.get().strip().upper()
-
-            if not keyword:
-                messagebox.showwarning("Error", "Please enter a keyword!")
-                return
-
-            expected_len = self.matrix_size * self.matrix_size
-            if len(matrix_str) != expected_len:
-                messagebox.showwarning(
-                    "Error", f"Matrix must have exactly {expected_len} characters!"
-                )
-                return
-
-            cipher_type = self.cipher_var.get()
+        inputs = self.read_job_inputs()
+        if inputs is None:
+            return
+        ciphertext, keyword, matrix_str, cipher_type = inputs
 
+        def work(stats):
             plaintext, substituted, matrix = decrypt(
-                ciphertext, matrix_str, keyword, cipher_type
+                ciphertext, matrix_str, keyword, cipher_type, collector=stats
             )
+            return plaintext, substituted
 
-            self.set_text(self.substituted_text, format_five(substituted))
-            self.set_text(self.output_text, plaintext)
-            self.set_text(self.filtered_text, "")
-            self.set_text(self.columns_text, "")
+        self.run_job("Decryption Error", work, self.show_decrypted)
 
-        except Exception as e:
-            messagebox.showerror("Decryption Error", str(e))
+    def show_decrypted(self, result):
+        plaintext, substituted = result
+        self.substituted_text.set_lines(GroupedLines(substituted))
+        self.output_text.set_text(plaintext)
+        self.set_text(self.filtered_text, "")
+        self.columns_text.set_text("")
+
+    def save_output(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                self.output_text.lines.save(f)
+        except OSError as e:
+            messagebox.showerror("Save Error", str(e))
@@ -0,0 +1,170 @@
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from adfgvx_cipher import KEY_CACHE_SIZE, CompiledCipher, KeyCache
+
+# Subor s klucmi tenantov:
+#   hlavicka | index zoradeny podla key_id | key_id | zaznamy
+# Subor sa otvara cez mmap, takze procesy citajuce ten isty subor zdielaju
+# stranky a pri otvoreni sa nic neparsuje; kluc sa hlada binarnym vyhladavanim
+MAGIC = b"ADFK"
+VERSION = 1
+# magic, verzia, pocet klucov
+HEADER = struct.Struct("<4sB3xI")
+# offset key_id, dlzka key_id, offset zaznamu, dlzka zaznamu
+INDEX_ENTRY = struct.Struct("<IIII")
+# dlzka mena typu, dlzka matice (UTF-8), dlzka keywordu; za nimi tieto
+# retazce a poradie stlpcov (uint16 na stlpec)
+RECORD = struct.Struct("<BHH")
+
+
+class KeyRecord(NamedTuple):
+    cipher_type: str
+    matrix_str: str
+    keyword: str
+    order: Tuple[int, ...]
+
+
+def _encode_record(cipher: CompiledCipher) -> bytes:
+    name = cipher.cipher_type.encode("ascii")
+    matrix = cipher.matrix_str.encode("utf-8")
+    keyword = cipher.keyword.encode("utf-8")
+    return (
+        RECORD.pack(len(name), len(matrix), len(keyword))
+        + name
+        + matrix
+        + keyword
+        + struct.pack(f"<{len(cipher.order)}H", *cipher.order)
+    )
+
+
+def write_keystore(path: str, keys: Iterable[Tuple[str, str, str, str]]) -> int:
+    # keys: (key_id, cipher_type, matrix, keyword); kazdy kluc sa pri zapise
+    # raz skompiluje, cim sa overi a ziska poradie stlpcov
+    entries = {}
+    for key_id, cipher_type, matrix_str, keyword in keys:
+        encoded_id = key_id.encode("utf-8")
+        if encoded_id in entries:
+            raise ValueError(f"Duplicate key id: {key_id}")
+        cipher = CompiledCipher(cipher_type, matrix_str, keyword)
+        entries[encoded_id] = _encode_record(cipher)
+
+    ids = sorted(entries)
+    id_start = HEADER.size + len(ids) * INDEX_ENTRY.size
+    record_start = id_start + sum(len(key_id) for key_id in ids)
+
+    index = []
+    id_pos, record_pos = id_start, record_start
+    for key_id in ids:
+        record = entries[key_id]
+        index.append(INDEX_ENTRY.pack(id_pos, len(key_id), record_pos, len(record)))
+        id_pos += len(key_id)
+        record_pos += len(record)
+
+    # Zapis do docasneho suboru a premenovanie, takze procesy, ktore
+    # maju stary subor namapovany, citaju dalej konzistentne data
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(ids)))
+        f.writelines(index)
+        f.writelines(ids)
+        f.writelines(entries[key_id] for key_id in ids)
+    os.replace(tmp_path, path)
+    return len(ids)
+
+
+class KeyStore:
+    def __init__(self, path: str, cache_size: int = KEY_CACHE_SIZE):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError("Not a key store file")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError("Not a key store file")
+        if version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Unsupported key store version: {version}")
+        self.count = count
+        # Skompilovane kluce tohto procesu, najcastejsi tenanti ostanu v nej
+        self.cache = KeyCache(cache_size)
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, key_id: str) -> bool:
+        return self._find(key_id) is not None
+
+    def _entry(self, position: int) -> Tuple[int, int, int, int]:
+        return INDEX_ENTRY.unpack_from(
+            self._mm, HEADER.size + position * INDEX_ENTRY.size
+        )
+
+    def _key_id(self, position: int) -> bytes:
+        id_offset, id_len, _, _ = self._entry(position)
+        return self._mm[id_offset : id_offset + id_len]
+
+    def _find(self, key_id: str) -> Optional[int]:
+        encoded_id = key_id.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_id(middle) < encoded_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._key_id(low) == encoded_id:
+            return low
+        return None
+
+    def keys(self) -> Iterator[str]:
+        for position in range(self.count):
+            yield self._key_id(position).decode("utf-8")
+
+    def record(self, key_id: str) -> KeyRecord:
+        position = self._find(key_id)
+        if position is None:
+            raise ValueError(f"Unknown key id: {key_id}")
+
+        _, _, offset, _ = self._entry(position)
+        name_len, matrix_len, keyword_len = RECORD.unpack_from(self._mm, offset)
+        pos = offset + RECORD.size
+        cipher_type = self._mm[pos : pos + name_len].decode("ascii")
+        pos += name_len
+        matrix_str = self._mm[pos : pos + matrix_len].decode("utf-8")
+        pos += matrix_len
+        keyword = self._mm[pos : pos + keyword_len].decode("utf-8")
+        pos += keyword_len
+        order = struct.unpack_from(f"<{len(keyword)}H", self._mm, pos)
+        return KeyRecord(cipher_type, matrix_str, keyword, order)
+
+    # Poradie stlpcov ide zo suboru, keyword sa uz netriedi a matica na
+    # zobrazenie sa nesklada
+    def cipher(self, key_id: str) -> CompiledCipher:
+        record = self.record(key_id)
+        return self.cache.get(
+            record.cipher_type,
+            record.matrix_str,
+            record.keyword,
+            order=record.order,
+        )
+
+    def encrypt(self, key_id: str, plaintext: str, engine: str = "python") -> str:
+        return self.cipher(key_id).encrypt_text(plaintext, engine)
+
+    def decrypt(self, key_id: str, ciphertext: str, engine: str = "python") -> str:
+        return self.cipher(key_id).decrypt_text(ciphertext, engine)
@@ -0,0 +1,152 @@
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+
+from adfgvx_cipher import (
+    compile_cipher,
+    get_transposition_plan,
+    resolve_cipher_type,
+)
+from fitness import QuadgramScorer
+
+ANNEAL_ITERATIONS = 20000
+ANNEAL_TEMPERATURE = 10.0
+ANNEAL_RESTARTS = 8
+
+
+class MatrixSolution(NamedTuple):
+    score: float
+    matrix_str: str
+    plaintext: str
+
+
+class _Annealer:
+    def __init__(self, cells: List[int], alphabet: str, scorer: QuadgramScorer):
+        missing = [c for c in alphabet if c not in scorer.codes]
+        if missing:
+            raise ValueError(
+                f"Scorer alphabet is missing characters: {''.join(missing)}"
+            )
+
+        self.cells = cells
+        self.alphabet = alphabet
+        self.scorer = scorer
+
+        # Pozicie v desifrovanom texte pre kazde policko matice
+        self.positions = [[] for _ in alphabet]
+        for pos, cell in enumerate(cells):
+            self.positions[cell].append(pos)
+        self.used = [cell for cell, found in enumerate(self.positions) if found]
+
+    def run(self, seed: int, iterations: int, temperature: float) -> Tuple[float, str]:
+        rng = random.Random(seed)
+        scorer = self.scorer
+        codes_of = scorer.codes
+
+        matrix = list(self.alphabet)
+        rng.shuffle(matrix)
+        codes = bytearray(codes_of[matrix[cell]] for cell in self.cells)
+        score = scorer.score_codes(codes)
+        best_score, best_matrix = score, matrix[:]
+
+        cell_count = len(matrix)
+        for step in range(iterations):
+            current_temperature = temperature * (1 - step / iterations)
+
+            # Vymena dvoch policok zmeni len pozicie tychto dvoch digrafov
+            a = rng.choice(self.used)
+            b = rng.randrange(cell_count)
+            if a == b:
+                continue
+            changes = {pos: codes_of[matrix[b]] for pos in self.positions[a]}
+            changes.update({pos: codes_of[matrix[a]] for pos in self.positions[b]})
+
+            delta = scorer.delta(codes, changes)
+            if delta < 0:
+                if current_temperature <= 0:
+                    continue
+                if rng.random() >= math.exp(delta / current_temperature):
+                    continue
+
+            for pos, code in changes.items():
+                codes[pos] = code
+            matrix[a], matrix[b] = matrix[b], matrix[a]
+            score += delta
+
+            if score > best_score:
+                best_score, best_matrix = score, matrix[:]
+
+        return best_score, "".join(best_matrix)
+
+
+# Stav v procese workera
+_worker_annealer: Optional[_Annealer] = None
+
+
+def _init_worker(annealer: _Annealer) -> None:
+    global _worker_annealer
+    _worker_annealer = annealer
+
+
+def _anneal_task(seed: int, iterations: int, temperature: float):
+    return _worker_annealer.run(seed, iterations, temperature)
+
+
+def solve_matrix(
+    substituted: str,
+    cipher_type: str,
+    scorer: QuadgramScorer,
+    restarts: int = ANNEAL_RESTARTS,
+    iterations: int = ANNEAL_ITERATIONS,
+    temperature: float = ANNEAL_TEMPERATURE,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> MatrixSolution:
+    alphabet, indices, size = resolve_cipher_type(cipher_type)
+
+    clean = "".join(c for c in substituted.upper() if c in indices)
+    cells = [
+        indices.index(clean[i]) * size + indices.index(clean[i + 1])
+        for i in range(0, len(clean) - 1, 2)
+    ]
+    # Bez jedineho digrafu nie je co vymienat
+    if not cells:
+        raise ValueError("Ciphertext too short")
+    annealer = _Annealer(cells, alphabet, scorer)
+
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(32) for _ in range(max(1, restarts))]
+
+    if restarts <= 1 or workers == 1:
+        results = [annealer.run(s, iterations, temperature) for s in seeds]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(annealer,)
+        ) as pool:
+            results = list(
+                pool.map(
+                    _anneal_task,
+                    seeds,
+                    [iterations] * len(seeds),
+                    [temperature] * len(seeds),
+                )
+            )
+
+    score, matrix_str = max(results)
+    cipher = compile_cipher(cipher_type, matrix_str, "A")
+    return MatrixSolution(score, matrix_str, cipher.unsubstitute(clean))
+
+
+def solve_with_keyword(
+    ciphertext: str,
+    keyword: str,
+    cipher_type: str,
+    scorer: QuadgramScorer,
+    **kwargs,
+) -> MatrixSolution:
+    # Transpozicia je znama, zostava len substitucia
+    _, indices, _ = resolve_cipher_type(cipher_type)
+    clean = "".join(c for c in ciphertext.upper() if c in indices)
+    substituted = get_transposition_plan(keyword.upper(), len(clean)).invert(clean)
+    return solve_matrix(substituted, cipher_type, scorer, **kwargs)
@@ -0,0 +1,127 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def available() -> bool:
+    return np is not None
+
+
+# uint8 polia funguju len ked matica aj indexy su ASCII
+def supports(cipher) -> bool:
+    return (
+        np is not None
+        and cipher.matrix_str.isascii()
+        and "".join(cipher.indices).isascii()
+    )
+
+
+def _as_array(text: str):
+    return np.frombuffer(text.encode("ascii", "ignore"), dtype=np.uint8)
+
+
+def _as_text(array) -> str:
+    return array.tobytes().decode("ascii")
+
+
+# Plany ostavaju v LRU cache (PLAN_CACHE_SIZE), preto sa do planu uklada len
+# permutacia kratkych textov; dlhsia sa postavi pri kazdom volani
+PERMUTATION_CACHE_MAX = 65536
+
+
+# ciphertext[i] == text[permutation[i]]
+def plan_permutation(plan):
+    permutation = plan.engine_data.get("numpy")
+    if permutation is None:
+        key_len = len(plan.keyword)
+        dtype = np.int32 if plan.length < 2**31 else np.intp
+        permutation = np.concatenate(
+            [np.arange(idx, plan.length, key_len, dtype=dtype) for idx in plan.order]
+        )
+        if plan.length <= PERMUTATION_CACHE_MAX:
+            plan.engine_data["numpy"] = permutation
+    return permutation
+
+
+class NumpyStages:
+    def __init__(self, cipher):
+        self.cipher = cipher
+        self.size = cipher.size
+
+        # znak -> digraf ako (256, 2) tabulka
+        self.digraphs = np.zeros((256, 2), dtype=np.uint8)
+        self.encodable = np.zeros(256, dtype=bool)
+        for char, digraph in cipher.encode_table.items():
+            self.digraphs[ord(char)] = [ord(digraph[0]), ord(digraph[1])]
+            self.encodable[ord(char)] = True
+
+        # ADFGX/ADFGVX znak -> cislo riadku/stlpca
+        self.index_of = np.zeros(256, dtype=np.intp)
+        for i, c in enumerate(cipher.indices):
+            self.index_of[ord(c)] = i
+
+        self.cells = np.frombuffer(cipher.matrix_str.encode("ascii"), dtype=np.uint8)
+
+    # Token -> text markera, ten sa potom zakoduje ako ostatne znaky
+    def substitute(self, filtered_text: str) -> str:
+        codes = _as_array(self.cipher.tokens.expand(filtered_text))
+        codes = codes[self.encodable[codes]]
+        return _as_text(self.digraphs[codes])
+
+    def transpose(self, substituted: str) -> str:
+        codes = _as_array(substituted)
+        return _as_text(codes[plan_permutation(self.cipher.plan(len(codes)))])
+
+    def untranspose(self, ciphertext: str) -> str:
+        codes = _as_array(ciphertext)
+        result = np.empty_like(codes)
+        result[plan_permutation(self.cipher.plan(len(codes)))] = codes
+        return _as_text(result)
+
+    # Zapisuje priamo do pamate bytearray, bez medzivysledku v bytes
+    def transpose_into(self, substituted: bytes, out: bytearray) -> bytearray:
+        codes = np.frombuffer(substituted, dtype=np.uint8)
+        permutation = plan_permutation(self.cipher.plan(len(codes)))
+        np.take(codes, permutation, out=np.frombuffer(out, dtype=np.uint8))
+        return out
+
+    def untranspose_into(self, ciphertext: bytes, out: bytearray) -> bytearray:
+        codes = np.frombuffer(ciphertext, dtype=np.uint8)
+        result = np.frombuffer(out, dtype=np.uint8)
+        result[plan_permutation(self.cipher.plan(len(codes)))] = codes
+        return out
+
+    def decode_pairs(self, substituted: str) -> str:
+        return self.decode_buffer(_as_array(substituted))
+
+    def decode_buffer(self, data) -> str:
+        codes = np.frombuffer(data, dtype=np.uint8)
+        pairs = len(codes) // 2
+        rows = self.index_of[codes[0 : 2 * pairs : 2]]
+        cols = self.index_of[codes[1 : 2 * pairs : 2]]
+        return _as_text(self.cells[rows * self.size + cols])
+
+    def unsubstitute(self, substituted: str) -> str:
+        return self.cipher.tokens.restore(self.decode_pairs(substituted))
+
+
+# Substitucia pre vsetky kluce naraz cez (K, 256, 2) tabulku, transpozicia
+# potom po riadkoch; expanded uz ma rozvinute markery
+def encrypt_fanout(ciphers, expanded: str):
+    stages = [cipher.stages("numpy") for cipher in ciphers]
+    codes = _as_array(expanded)
+
+    encodable = stages[0].encodable
+    if all(np.array_equal(s.encodable, encodable) for s in stages):
+        codes = codes[encodable[codes]]
+        tables = np.stack([s.digraphs for s in stages])
+        rows = tables[:, codes].reshape(len(stages), -1)
+    else:
+        # Matice s chybajucimi znakmi maju rozne dlzky vysledku
+        rows = [s.digraphs[codes[s.encodable[codes]]].reshape(-1) for s in stages]
+
+    return [
+        _as_text(row[plan_permutation(cipher.plan(len(row)))])
+        for cipher, row in zip(ciphers, rows)
+    ]
@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from adfgvx_cipher import compile_cipher, key_cache
+from batch import BatchResult, _run_chunk
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+WARM_KEYS = 128
+BATCH_MAX = 256
+BATCH_WINDOW = 0.002
+LATENCY_WINDOW = 1000
+ENGINES = ("python", "numpy")
+# Jedna poziadavka (riadok JSON) moze mat najviac toto bajtov
+MAX_LINE = 64 * 1024 * 1024
+
+# (cipher_type, matica, keyword)
+CipherKey = Tuple[str, str, str]
+
+
+# Skompilovane kluce ostavaju v key_cache servera aj kazdeho workera
+def _init_worker(warm_keys: int) -> None:
+    key_cache.resize(warm_keys)
+
+
+def _process_batch(
+    mode: str, engine: str, key: CipherKey, texts: List[str]
+) -> List[BatchResult]:
+    return _run_chunk(mode, engine, texts, compile_cipher(*key))
+
+
+class _Pending:
+    __slots__ = ("mode", "engine", "key", "text", "future", "start")
+
+    def __init__(self, mode, engine, key, text, future):
+        self.mode = mode
+        self.engine = engine
+        self.key = key
+        self.text = text
+        self.future = future
+        self.start = time.perf_counter()
+
+
+class CipherServer:
+    # Poziadavky z ciasoveho okna sa zoskupia podla kluca a operacie a kazda
+    # skupina ide do workera naraz, takze male spravy neplatia IPC kazda zvlast
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_max: int = BATCH_MAX,
+        batch_window: float = BATCH_WINDOW,
+        warm_keys: int = WARM_KEYS,
+    ):
+        if batch_max <= 0:
+            raise ValueError("Batch size must be positive")
+
+        self.workers = workers
+        self.batch_max = batch_max
+        self.batch_window = batch_window
+        self.warm_keys = warm_keys
+
+        self.queue = None
+        self.pool = None
+        self._batcher = None
+        self._groups = set()
+
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.max_queue_depth = 0
+        self.in_flight = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue()
+        key_cache.resize(self.warm_keys)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.warm_keys,),
+        )
+        self._batcher = asyncio.ensure_future(self._collect())
+
+    async def close(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        if self._groups:
+            await asyncio.gather(*self._groups, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    async def submit(
+        self, mode: str, engine: str, key: CipherKey, text: str
+    ) -> BatchResult:
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(_Pending(mode, engine, key, text, future))
+        self.in_flight += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return await future
+
+    async def _collect(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            # Kratke okno, aby sa pridali aj sucasne prichadzajuce poziadavky
+            await asyncio.sleep(self.batch_window)
+            while len(batch) < self.batch_max and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            groups: Dict[Tuple[str, str, CipherKey], List[_Pending]] = {}
+            for item in batch:
+                groups.setdefault((item.mode, item.engine, item.key), []).append(item)
+
+            for (mode, engine, key), items in groups.items():
+                task = asyncio.ensure_future(self._run_group(mode, engine, key, items))
+                self._groups.add(task)
+                task.add_done_callback(self._groups.discard)
+
+    async def _run_group(
+        self, mode: str, engine: str, key: CipherKey, items: List[_Pending]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.batched_requests += len(items)
+        try:
+            results = await loop.run_in_executor(
+                self.pool,
+                _process_batch,
+                mode,
+                engine,
+                key,
+                [item.text for item in items],
+            )
+        except Exception as e:
+            results = [BatchResult(None, f"{type(e).__name__}: {e}")] * len(items)
+
+        now = time.perf_counter()
+        for item, result in zip(items, results):
+            self.in_flight -= 1
+            self.latencies.append(now - item.start)
+            if not item.future.done():
+                item.future.set_result(result)
+
+    def stats(self) -> Dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3
+
+        return {
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": (
+                self.batched_requests / self.batches if self.batches else 0.0
+            ),
+            "keys": key_cache.stats(),
+            "latency_ms": {
+                "mean": sum(latencies) / len(latencies) * 1e3 if latencies else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": latencies[-1] * 1e3 if latencies else 0.0,
+            },
+        }
+
+    # {"op": "encrypt"|"decrypt"|"stats", "id": ..., "text": ..., "matrix": ...,
+    #  "keyword": ..., "type": "ADFGVX", "engine": "python"}
+    async def handle_request(self, line: bytes) -> Dict:
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = request.get("id")
+
+            op = request.get("op")
+            if op == "stats":
+                return {"id": request_id, "result": self.stats()}
+            if op not in ("encrypt", "decrypt"):
+                raise ValueError(f"Unknown op: {op}")
+
+            self.requests += 1
+            key = (
+                request.get("type", "ADFGVX"),
+                str(request["matrix"]).upper(),
+                str(request["keyword"]),
+            )
+            engine = request.get("engine", "python")
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown engine: {engine}")
+            # Neplatny kluc sa ohlasi hned, bez cesty do workera
+            compile_cipher(*key)
+
+            result = await self.submit(op, engine, key, str(request["text"]))
+            if result.error is not None:
+                # Chyba z workera uz ma tvar "Typ: sprava"
+                self.errors += 1
+                return {"id": request_id, "error": result.error}
+            return {"id": request_id, "result": result.text}
+        except (ValueError, KeyError, TypeError) as e:
+            self.errors += 1
+            return {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+
+    # Spojenie ostava otvorene, poziadavky sa spracuvaju subezne a odpovede
+    # chodia v poradi dokoncenia (sparuju sa cez id)
+    async def handle_connection(self, reader, writer) -> None:
+        tasks = set()
+        # drain() sa nesmie volat subezne (Python 3.8/3.9 na tom padne),
+        # preto zapisy jedneho spojenia idu po jednom
+        write_lock = asyncio.Lock()
+
+        async def respond(line):
+            response = await self.handle_request(line)
+            async with write_lock:
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Riadok dlhsi ako MAX_LINE
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+
+async def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    unix_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    batch_max: int = BATCH_MAX,
+    batch_window: float = BATCH_WINDOW,
+    warm_keys: int = WARM_KEYS,
+) -> None:
+    server = CipherServer(workers, batch_max, batch_window, warm_keys)
+    await server.start()
+    try:
+        if unix_path is not None:
+            listener = await asyncio.start_unix_server(
+                server.handle_connection, unix_path, limit=MAX_LINE
+            )
+        else:
+            listener = await asyncio.start_server(
+                server.handle_connection, host, port, limit=MAX_LINE
+            )
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Local JSON-lines encryption service."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, help="worker processes")
+    parser.add_argument("--batch-max", type=int, default=BATCH_MAX)
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=BATCH_WINDOW * 1e3,
+        help="how long to wait for more requests before dispatching a batch",
+    )
+    parser.add_argument(
+        "--warm-keys",
+        type=int,
+        default=WARM_KEYS,
+        help="compiled keys kept in memory per process",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                args.unix,
+                args.workers,
+                args.batch_max,
+                args.batch_window_ms / 1e3,
+                args.warm_keys,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())